@@ -0,0 +1,19 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PostCursorPagination(CursorPagination):
+    '''Курсор по индексу (pub_date, id), как у лент на сайте.'''
+
+    ordering = ('-pub_date', '-id')
+
+
+class CommentCursorPagination(CursorPagination):
+    '''Курсор по индексу (post, created, id).'''
+
+    ordering = ('created', 'id')
+
+
+class IdCursorPagination(CursorPagination):
+    '''Пагинация API по умолчанию.'''
+
+    ordering = ('id',)
@@ -0,0 +1,11 @@
+from rest_framework import permissions
+
+
+class IsAuthorOrReadOnly(permissions.IsAuthenticatedOrReadOnly):
+    '''Менять и удалять объект может только его автор.'''
+
+    def has_object_permission(self, request, view, obj):
+        return (
+            request.method in permissions.SAFE_METHODS
+            or obj.author_id == request.user.pk
+        )
@@ -0,0 +1,122 @@
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
+
+from posts import images
+from posts.follows import BATCH_LIMIT
+from posts.models import Comment, Follow, Group, Post, User
+
+
+def requested_fields(request):
+    '''Поля из ?fields=id,text или None, если параметра нет.'''
+    if request is None or 'fields' not in request.query_params:
+        return None
+    return {
+        name.strip()
+        for name in request.query_params['fields'].split(',')
+        if name.strip()
+    }
+
+
+class SparseFieldsMixin:
+    '''Ответ только с полями из ?fields= (sparse fieldsets).
+
+    Неизвестные имена игнорируются; без параметра отдаются все поля.
+    Набор полей после этого не меняется, поэтому список полей для
+    чтения собирается один раз на сериализатор, а не для каждой строки
+    списка, как в DRF.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'))
+        if fields is not None:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+    @cached_property
+    def _readable_fields(self):
+        return tuple(super()._readable_fields)
+
+
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author = serializers.SlugRelatedField(
+        slug_field='username', read_only=True
+    )
+
+    class Meta:
+        model = Post
+        fields = (
+            'id', 'text', 'author', 'pub_date', 'updated_at', 'group',
+            'image', 'excerpt', 'word_count', 'comments_count',
+        )
+        read_only_fields = (
+            'pub_date', 'updated_at', 'excerpt', 'word_count',
+            'comments_count',
+        )
+
+    def validate_image(self, value):
+        return images.clean(value)
+
+
+class GroupSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Group
+        fields = ('id', 'title', 'slug', 'description')
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author = serializers.SlugRelatedField(
+        slug_field='username', read_only=True
+    )
+
+    class Meta:
+        model = Comment
+        fields = ('id', 'post', 'author', 'text', 'created', 'updated_at')
+        read_only_fields = ('post', 'created', 'updated_at')
+
+
+class FollowSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    user = serializers.SlugRelatedField(
+        slug_field='username',
+        read_only=True,
+        default=serializers.CurrentUserDefault()
+    )
+    author = serializers.SlugRelatedField(
+        slug_field='username', queryset=User.objects.all()
+    )
+
+    class Meta:
+        model = Follow
+        fields = ('id', 'user', 'author')
+        validators = [
+            UniqueTogetherValidator(
+                queryset=Follow.objects.all(),
+                fields=('user', 'author'),
+                message='Вы уже подписаны на этого автора.'
+            )
+        ]
+
+    def validate_author(self, author):
+        if author == self.context['request'].user:
+            raise serializers.ValidationError(
+                'Нельзя подписаться на самого себя.'
+            )
+        return author
+
+
+class FollowBatchSerializer(serializers.Serializer):
+    '''Имена авторов для подписки и отписки одним запросом.'''
+
+    follow = serializers.ListField(
+        child=serializers.CharField(max_length=150),
+        max_length=BATCH_LIMIT,
+        required=False,
+        default=list
+    )
+    unfollow = serializers.ListField(
+        child=serializers.CharField(max_length=150),
+        max_length=BATCH_LIMIT,
+        required=False,
+        default=list
+    )
@@ -0,0 +1,214 @@
+'''REST API постов, групп, комментариев и подписок.
+
+Querysets выбирают только колонки запрошенных в ?fields= полей и
+связанные объекты в том же запросе. Посты и комментарии отвечают 304
+по тем же дешёвым валидаторам, что и страницы сайта, — до выборки и
+сериализации; группы и подписки — по хешу готового ответа.
+'''
+import hashlib
+
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.decorators import method_decorator
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from api.pagination import CommentCursorPagination, PostCursorPagination
+from api.permissions import IsAuthorOrReadOnly
+from api.serializers import (
+    CommentSerializer, FollowBatchSerializer, FollowSerializer,
+    GroupSerializer, PostSerializer, requested_fields
+)
+from posts.conditional import conditional, feed_validators, post_validators
+from posts.follows import BATCH_LIMIT, follow_many, unfollow_many
+from posts.models import Comment, Follow, Group, Post
+from posts.page_cache import COMMENTS, INDEX
+
+# Колонки модели для каждого поля API; колонки порядка курсора
+# выбираются всегда, иначе пагинатор догружал бы их по одной строке.
+POST_COLUMNS = {
+    'id': ('id',),
+    'text': ('text',),
+    'author': ('author', 'author__username'),
+    'pub_date': ('pub_date',),
+    'updated_at': ('updated_at',),
+    'group': ('group',),
+    'image': ('image',),
+    'excerpt': ('excerpt',),
+    'word_count': ('word_count',),
+    'comments_count': ('comments_count',),
+}
+COMMENT_COLUMNS = {
+    'id': ('id',),
+    'post': ('post',),
+    'author': ('author', 'author__username'),
+    'text': ('text',),
+    'created': ('created',),
+    'updated_at': ('updated_at',),
+}
+
+
+def columns(request, mapping, always):
+    '''Колонки для .only() по ?fields= запроса на чтение.'''
+    fields = None
+    if request.method in permissions.SAFE_METHODS:
+        fields = requested_fields(request)
+    names = mapping if fields is None else fields & mapping.keys()
+    return {*always, *(
+        column for name in names for column in mapping[name]
+    )}
+
+
+def requested_ids(request):
+    '''id постов из ?ids=1,2,3 без повторов, не больше BATCH_LIMIT.'''
+    try:
+        ids = list(dict.fromkeys(
+            int(value) for value in request.query_params.get('ids', '')
+            .split(',') if value.strip()
+        ))
+    except ValueError:
+        raise ValidationError({'ids': 'Ожидаются id постов через запятую.'})
+    if len(ids) > BATCH_LIMIT:
+        raise ValidationError({'ids': f'Не больше {BATCH_LIMIT} id.'})
+    return ids
+
+
+def post_list_scopes(request):
+    return (INDEX, COMMENTS)
+
+
+def post_detail_validators(request, pk):
+    return post_validators(request, pk)
+
+
+class ContentETagMixin:
+    '''ETag по хешу тела ответа для ресурсов без дешёвых валидаторов:
+    экономит трафик клиента, но не работу сервера.'''
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if (
+            request.method not in permissions.SAFE_METHODS
+            or response.status_code != 200
+        ):
+            return response
+        response.render()
+        etag = quote_etag(hashlib.md5(response.content).hexdigest())
+        response['ETag'] = etag
+        return get_conditional_response(request, etag=etag, response=response)
+
+
+class PostViewSet(viewsets.ModelViewSet):
+    serializer_class = PostSerializer
+    permission_classes = (IsAuthorOrReadOnly,)
+    pagination_class = PostCursorPagination
+
+    def get_queryset(self):
+        only = columns(self.request, POST_COLUMNS, ('id', 'pub_date'))
+        queryset = Post.objects.only(*only)
+        if 'author' in only:
+            queryset = queryset.select_related('author')
+        group = self.request.query_params.get('group')
+        if group:
+            queryset = queryset.filter(group__slug=group)
+        author = self.request.query_params.get('author')
+        if author:
+            queryset = queryset.filter(author__username=author)
+        return queryset
+
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user)
+
+    @method_decorator(conditional(feed_validators(post_list_scopes)))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @method_decorator(conditional(post_detail_validators))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False)
+    @method_decorator(conditional(feed_validators(post_list_scopes)))
+    def batch(self, request):
+        '''Посты по списку ?ids= одним запросом, результат для каждого id.'''
+        ids = requested_ids(request)
+        found = self.get_queryset().in_bulk(ids)
+        data = iter(self.get_serializer(
+            [found[pk] for pk in ids if pk in found], many=True
+        ).data)
+        return Response({'results': [
+            {'id': pk, 'status': 'ok', 'post': next(data)}
+            if pk in found else {'id': pk, 'status': 'not_found'}
+            for pk in ids
+        ]})
+
+
+class GroupViewSet(ContentETagMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Group.objects.all()
+    serializer_class = GroupSerializer
+
+
+class CommentViewSet(viewsets.ModelViewSet):
+    serializer_class = CommentSerializer
+    permission_classes = (IsAuthorOrReadOnly,)
+    pagination_class = CommentCursorPagination
+
+    def get_post(self):
+        return get_object_or_404(
+            Post.objects.only('id'), pk=self.kwargs['post_id']
+        )
+
+    def get_queryset(self):
+        only = columns(
+            self.request, COMMENT_COLUMNS, ('id', 'post', 'created')
+        )
+        queryset = Comment.objects.filter(post=self.get_post()).only(*only)
+        if 'author' in only:
+            queryset = queryset.select_related('author')
+        return queryset
+
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user, post=self.get_post())
+
+    @method_decorator(conditional(post_validators))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+class FollowViewSet(
+    ContentETagMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet
+):
+    serializer_class = FollowSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_queryset(self):
+        return Follow.objects.filter(user=self.request.user).select_related(
+            'user', 'author'
+        ).only('id', 'user__username', 'author__username')
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        '''Подписка и отписка списками имён; статус для каждого имени.'''
+        serializer = FollowBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = {}
+        for key, apply in (('follow', follow_many),
+                           ('unfollow', unfollow_many)):
+            results[key] = [
+                {'username': username, 'status': result}
+                for username, result in apply(
+                    request.user, serializer.validated_data[key]
+                )
+            ]
+        return Response(results, status=status.HTTP_200_OK)
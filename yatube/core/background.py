@@ -0,0 +1,57 @@
+'''Работа после коммита, которая не должна задерживать ответ.
+
+Задачи выполняются в пуле потоков процесса. БД SQLite в памяти нельзя
+делить между потоками, с ней (и с background=False) задача выполняется
+синхронно сразу после коммита.
+'''
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BACKGROUND_WORKERS,
+            thread_name_prefix='background'
+        )
+    return _executor
+
+
+def shared_database():
+    return not (
+        connection.vendor == 'sqlite' and connection.is_in_memory_db()
+    )
+
+
+def run(task, *args):
+    try:
+        task(*args)
+    except Exception:
+        logger.exception(
+            'Фоновая задача %s%s не выполнена', task.__name__, args
+        )
+
+
+def run_in_thread(task, *args):
+    try:
+        run(task, *args)
+    finally:
+        connection.close()
+
+
+def on_commit(task, *args, background=True):
+    '''Выполняет task(*args) после коммита текущей транзакции.'''
+    if background and shared_database():
+        transaction.on_commit(
+            lambda: executor().submit(run_in_thread, task, *args)
+        )
+    else:
+        transaction.on_commit(lambda: run(task, *args))
@@ -0,0 +1,46 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def benchmark_database(name=None):
+    """Временная тестовая БД: бенчмарки не трогают рабочие данные.
+
+    name задаёт файл БД, если её должны видеть несколько процессов.
+    """
+    test_settings = connection.settings_dict['TEST']
+    old_name = connection.settings_dict['NAME']
+    old_test_name = test_settings['NAME']
+    if name:
+        test_settings['NAME'] = name
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings['NAME'] = old_test_name
+
+
+def timings(func, repeat=20):
+    """Время выполнения func в миллисекундах для каждого из repeat запусков."""
+    result = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        result.append((time.perf_counter() - started) * 1000)
+    return result
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summary(values):
+    """Медиана и p95 в миллисекундах."""
+    return statistics.median(values), percentile(values, 95)
@@ -0,0 +1,51 @@
+import sqlite3
+import time
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.routers import PRIMARY
+
+
+def replicate(source, target):
+    '''Копирует согласованный снимок SQLite-файла source в target.'''
+    with closing(sqlite3.connect(source)) as primary, \
+            closing(sqlite3.connect(target)) as replica:
+        primary.backup(replica)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заменитель репликации для локальной проверки: периодически '
+        'копирует основную SQLite-БД в файлы реплик'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Пауза между копиями, секунды'
+        )
+        parser.add_argument(
+            '--once', action='store_true', help='Скопировать один раз'
+        )
+
+    def handle(self, *args, **options):
+        databases = [PRIMARY, *settings.REPLICA_DATABASES]
+        if any(connections[alias].vendor != 'sqlite' for alias in databases):
+            raise CommandError('Команда копирует только SQLite-файлы')
+        if not settings.REPLICA_DATABASES:
+            raise CommandError('Реплики не заданы: DATABASE_REPLICAS')
+        source = settings.DATABASES[PRIMARY]['NAME']
+        while True:
+            started = time.perf_counter()
+            for alias in settings.REPLICA_DATABASES:
+                replicate(source, settings.DATABASES[alias]['NAME'])
+            self.stdout.write(
+                f'Реплики обновлены за '
+                f'{(time.perf_counter() - started) * 1000:.0f}ms'
+            )
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,259 @@
+'''Замеры запросов: SQL, кеш, рендеринг шаблонов и гистограммы Prometheus.
+
+Замеры текущего запроса копятся в RequestTimings из contextvar; код вне
+запроса (команды, фоновые потоки) его не видит и ничего не записывает.
+Гистограммы живут в памяти процесса, как в prometheus_client без
+multiprocess-режима: при нескольких воркерах каждый отдаёт свои.
+'''
+import contextvars
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+
+from django.core.cache import caches
+from django.db import connections
+from django.template.backends import django as django_backend
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HISTOGRAMS = {
+    'yatube_request_duration_seconds': 'Полное время обработки запроса',
+    'yatube_db_duration_seconds': 'Время SQL-запросов за запрос',
+    'yatube_render_duration_seconds': 'Время рендеринга шаблонов за запрос',
+}
+COUNTERS = {
+    'yatube_requests_total': 'Число запросов',
+    'yatube_db_queries_total': 'Число SQL-запросов',
+    'yatube_cache_hits_total': 'Попадания в кеш',
+    'yatube_cache_misses_total': 'Промахи кеша',
+}
+# Счётчики кеша страниц лент: метка и описание.
+PAGE_CACHE_COUNTERS = {
+    'yatube_page_cache_hits_total': ('view', 'Страница взята из кеша'),
+    'yatube_page_cache_misses_total': ('view', 'Страница собрана заново'),
+    'yatube_page_cache_evictions_total': (
+        'scope', 'Ленты, страницы которых стали устаревшими'
+    ),
+}
+
+current = contextvars.ContextVar('request_timings', default=None)
+_missing = object()
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.render = 0.0
+        self.render_depth = 0
+        self.total = 0.0
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def server_timing(self):
+        '''Значение заголовка Server-Timing, длительности в мс.'''
+        return ', '.join((
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f'cache;desc="{self.cache_hits} hits / '
+            f'{self.cache_misses} misses"',
+            f'render;dur={self.render * 1000:.1f}',
+            f'total;dur={self.total * 1000:.1f}',
+        ))
+
+    def log_fields(self):
+        return {
+            'total_ms': round(self.total * 1000, 1),
+            'db_ms': round(self.db * 1000, 1),
+            'queries': self.queries,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'render_ms': round(self.render * 1000, 1),
+        }
+
+
+def record_query(execute, sql, params, many, context):
+    '''execute_wrapper: время и число SQL-запросов.'''
+    timings = current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - started
+        timings.queries += 1
+
+
+def _count_get(get):
+    @wraps(get)
+    def wrapper(key, default=None, version=None):
+        timings = current.get()
+        if timings is None:
+            return get(key, default, version)
+        value = get(key, _missing, version)
+        if value is _missing:
+            timings.cache_misses += 1
+            return default
+        timings.cache_hits += 1
+        return value
+    return wrapper
+
+
+def _count_get_many(get_many):
+    @wraps(get_many)
+    def wrapper(keys, version=None):
+        keys = list(keys)
+        values = get_many(keys, version)
+        timings = current.get()
+        if timings is not None:
+            timings.cache_hits += len(values)
+            timings.cache_misses += len(keys) - len(values)
+        return values
+    return wrapper
+
+
+def instrument_caches():
+    '''Подсчёт попаданий в кеши этого потока.
+
+    Бэкенды кеша создаются отдельно для каждого потока, поэтому методы
+    оборачиваются у экземпляра один раз при первом запросе в потоке.
+    '''
+    for alias in caches.settings:
+        backend = caches[alias]
+        if getattr(backend, '_timed', False):
+            continue
+        backend.get = _count_get(backend.get)
+        backend.get_many = _count_get_many(backend.get_many)
+        backend._timed = True
+
+
+def _timed_render(render):
+    @wraps(render)
+    def wrapper(self, context=None, request=None):
+        timings = current.get()
+        if timings is None:
+            return render(self, context, request)
+        timings.render_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            timings.render_depth -= 1
+            if not timings.render_depth:
+                timings.render += time.perf_counter() - started
+    return wrapper
+
+
+def instrument_templates():
+    '''Замер рендеринга шаблонов движка Django; вложенные не суммируются.'''
+    template = django_backend.Template
+    if not getattr(template.render, '_timed', False):
+        template.render = _timed_render(template.render)
+        template.render._timed = True
+
+
+@contextmanager
+def measure():
+    '''Замеры всего, что выполняется внутри блока, в том числе в потоках
+    sync_to_async: они получают копию контекста с теми же замерами.'''
+    instrument_caches()
+    timings = RequestTimings()
+    token = current.set(timings)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(record_query))
+            yield timings
+    finally:
+        current.reset(token)
+        timings.finish()
+
+
+class Registry:
+    '''Гистограммы и счётчики по имени view.'''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.histograms = {name: {} for name in HISTOGRAMS}
+        self.counters = {name: {} for name in COUNTERS}
+        self.page_cache = {name: {} for name in PAGE_CACHE_COUNTERS}
+
+    def count(self, name, label, increment=1):
+        '''Увеличивает счётчик кеша страниц с меткой label.'''
+        with self.lock:
+            counter = self.page_cache[name]
+            counter[label] = counter.get(label, 0) + increment
+
+    def observe(self, view, timings):
+        values = {
+            'yatube_request_duration_seconds': timings.total,
+            'yatube_db_duration_seconds': timings.db,
+            'yatube_render_duration_seconds': timings.render,
+        }
+        increments = {
+            'yatube_requests_total': 1,
+            'yatube_db_queries_total': timings.queries,
+            'yatube_cache_hits_total': timings.cache_hits,
+            'yatube_cache_misses_total': timings.cache_misses,
+        }
+        with self.lock:
+            for name, value in values.items():
+                buckets, total = self.histograms[name].setdefault(
+                    view, ([0] * len(BUCKETS), [0.0, 0])
+                )
+                for index, bound in enumerate(BUCKETS):
+                    if value <= bound:
+                        buckets[index] += 1
+                total[0] += value
+                total[1] += 1
+            for name, increment in increments.items():
+                counter = self.counters[name]
+                counter[view] = counter.get(view, 0) + increment
+
+    def exposition(self):
+        '''Текстовый формат Prometheus 0.0.4.'''
+        lines = []
+        with self.lock:
+            for name, help_text in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {help_text}',
+                          f'# TYPE {name} histogram']
+                for view, (buckets, total) in sorted(
+                    self.histograms[name].items()
+                ):
+                    label = f'view="{escape(view)}"'
+                    for bound, count in zip(BUCKETS, buckets):
+                        lines.append(
+                            f'{name}_bucket{{{label},le="{bound}"}} {count}'
+                        )
+                    lines += [
+                        f'{name}_bucket{{{label},le="+Inf"}} {total[1]}',
+                        f'{name}_sum{{{label}}} {total[0]:.6f}',
+                        f'{name}_count{{{label}}} {total[1]}',
+                    ]
+            for name, help_text in COUNTERS.items():
+                lines += [f'# HELP {name} {help_text}',
+                          f'# TYPE {name} counter']
+                for view, value in sorted(self.counters[name].items()):
+                    lines.append(f'{name}{{view="{escape(view)}"}} {value}')
+            for name, (label, help_text) in PAGE_CACHE_COUNTERS.items():
+                lines += [f'# HELP {name} {help_text}',
+                          f'# TYPE {name} counter']
+                for value, count in sorted(self.page_cache[name].items()):
+                    lines.append(
+                        f'{name}{{{label}="{escape(value)}"}} {count}'
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+def escape(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+registry = Registry()
@@ -0,0 +1,119 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core import metrics, routers
+
+logger = logging.getLogger('core.metrics')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class AsyncCapableMiddleware:
+    '''Middleware, работающее и под WSGI, и под ASGI без переключения
+    цепочки в синхронный режим.'''
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+
+class PerformanceMiddleware(AsyncCapableMiddleware):
+    '''Замеры SQL, кеша, шаблонов и общего времени для каждого view.
+
+    Итог уходит в заголовок Server-Timing, в гистограммы /metrics и,
+    при PERF_METRICS_LOG, строкой в лог core.metrics. Без PERF_METRICS
+    middleware отключается при запуске и ничего не стоит.
+    '''
+
+    def __init__(self, get_response):
+        if not settings.PERF_METRICS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        metrics.instrument_templates()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with metrics.measure() as timings:
+            response = self.get_response(request)
+        return self.report(request, response, timings)
+
+    async def __acall__(self, request):
+        with metrics.measure() as timings:
+            response = await self.get_response(request)
+        return self.report(request, response, timings)
+
+    def report(self, request, response, timings):
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        metrics.registry.observe(view, timings)
+        response['Server-Timing'] = timings.server_timing()
+        if settings.PERF_METRICS_LOG:
+            fields = {
+                'view': view,
+                'method': request.method,
+                'status': response.status_code,
+                **timings.log_fields(),
+            }
+            logger.info(
+                ' '.join(f'{key}={value}' for key, value in fields.items()),
+                extra=fields
+            )
+        return response
+
+
+class ReplicaMiddleware(AsyncCapableMiddleware):
+    '''Чтение с реплик для GET-запросов и «липкость» после записи.
+
+    После POST или любой записи в БД ставится cookie на
+    REPLICA_STICKY_SECONDS: пока реплики догоняют основную БД, этот
+    пользователь читает из основной и видит свой пост или комментарий.
+    '''
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        allowed = self.replica_allowed(request)
+        token = routers.replica_reads.set(allowed)
+        try:
+            response = self.get_response(request)
+            wrote = allowed and not routers.replica_reads.get()
+        finally:
+            routers.replica_reads.reset(token)
+        return self.stick(request, response, wrote)
+
+    async def __acall__(self, request):
+        allowed = self.replica_allowed(request)
+        token = routers.replica_reads.set(allowed)
+        try:
+            response = await self.get_response(request)
+            wrote = allowed and not routers.replica_reads.get()
+        finally:
+            routers.replica_reads.reset(token)
+        return self.stick(request, response, wrote)
+
+    def replica_allowed(self, request):
+        return (
+            request.method in SAFE_METHODS
+            and settings.REPLICA_STICKY_COOKIE not in request.COOKIES
+        )
+
+    def stick(self, request, response, wrote):
+        if request.method not in SAFE_METHODS or wrote:
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax'
+            )
+        return response
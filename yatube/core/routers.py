@@ -0,0 +1,47 @@
+'''Маршрутизация чтения на реплики БД.
+
+Чтение уходит на реплику только внутри безопасного (GET/HEAD) запроса,
+который ещё ничего не записал; команды, фоновые задачи и всё после
+первой записи работают с основной БД.
+'''
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+
+PRIMARY = 'default'
+# app_label таблицы DatabaseCache: кеш всегда в основной БД.
+CACHE_APP_LABEL = 'django_cache'
+
+replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def primary():
+    '''Читать из основной БД внутри блока.'''
+    token = replica_reads.set(False)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == CACHE_APP_LABEL:
+            return PRIMARY
+        if settings.REPLICA_DATABASES and replica_reads.get():
+            return random.choice(settings.REPLICA_DATABASES)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != CACHE_APP_LABEL:
+            replica_reads.set(False)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
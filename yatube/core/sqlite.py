@@ -0,0 +1,16 @@
+from django.conf import settings
+
+
+def configure_connection(sender, connection, **kwargs):
+    '''Настраивает каждое новое соединение с SQLite.
+
+    WAL позволяет читать во время записи, busy_timeout заставляет
+    писателей ждать блокировку вместо «database is locked», а
+    synchronous=NORMAL в режиме WAL не теряет согласованность при сбое
+    процесса, только последние транзакции при отключении питания.
+    '''
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
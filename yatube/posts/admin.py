@@ -1,34 +1,117 @@
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
 
 from posts.models import Comment, Follow, Group, Post
+from posts.paginators import EstimatedCountPaginator
+from posts.search import matching_posts
 
 
-class PostAdmin(admin.ModelAdmin):
+class RowAutocompleteSelect(AutocompleteSelect):
+    '''Автодополнение, которому выбранный объект передаёт строка.
+
+    В list_editable связанный объект строки уже загружен через
+    list_select_related, поэтому отдельный запрос на строку не нужен.
+    '''
+
+    selected = None
+
+    def optgroups(self, name, value, attr=None):
+        selected = self.selected
+        if selected is None or set(map(str, value)) != {str(selected.pk)}:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name,
+            selected.pk,
+            self.choices.field.label_from_instance(selected),
+            True,
+            len(options)
+        ))
+        return [(None, options, 0)]
+
+
+class ChangeListAdmin(admin.ModelAdmin):
+    '''Changelist, который не замедляется с ростом таблицы.
+
+    Связанные объекты строк берутся одним JOIN (list_select_related),
+    внешние ключи выбираются автодополнением вместо <select> со всеми
+    строками, а число строк оценивается без полного COUNT(*).
+    '''
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    empty_value_display = '-пусто-'
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if (
+            'widget' not in kwargs
+            and db_field.name in self.get_autocomplete_fields(request)
+        ):
+            kwargs['widget'] = RowAutocompleteSelect(
+                db_field, self.admin_site, using=kwargs.get('using')
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        base = super().get_changelist_form(request, **kwargs)
+
+        class ChangeListForm(base):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                if self.instance.pk is None:
+                    return
+                for name, field in self.fields.items():
+                    widget = getattr(field.widget, 'widget', field.widget)
+                    if isinstance(widget, RowAutocompleteSelect):
+                        widget.selected = getattr(self.instance, name)
+
+        return ChangeListForm
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title', 'slug')
+    empty_value_display = '-пусто-'
+
+
+class PostAdmin(ChangeListAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     list_editable = ('group',)
-    empty_value_display = '-пусто-'
+    autocomplete_fields = ('author', 'group')
+    date_hierarchy = 'pub_date'
+
+    def get_search_results(self, request, queryset, search_term):
+        '''Поиск по тексту идёт по полнотекстовому индексу, а не LIKE.'''
+        if not search_term:
+            return queryset, False
+        return matching_posts(queryset, search_term), False
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ChangeListAdmin):
     list_display = ('pk', 'post', 'created', 'text', 'author')
-    search_fields = ('text', 'post',)
+    list_select_related = ('post', 'author')
+    search_fields = ('text',)
     list_filter = ('created',)
-    empty_value_display = '-пусто-'
+    autocomplete_fields = ('post', 'author')
+    date_hierarchy = 'created'
 
 
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(ChangeListAdmin):
     list_display = ('author', 'user')
-    search_fields = ('author',)
-    list_filter = ('author',)
+    list_select_related = ('author', 'user')
+    search_fields = ('author__username', 'user__username')
     list_editable = ('user',)
-    empty_value_display = '-пусто-'
+    autocomplete_fields = ('author', 'user')
 
 
 admin.site.register(Post, PostAdmin)
 
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
 
 admin.site.register(Comment, CommentAdmin)
 
@@ -0,0 +1,86 @@
+'''Async-версии страниц для чтения, подключаются под ASGI (ASYNC_VIEWS).
+
+Запросы, контекст и шаблон у них те же, что у posts.views: страница
+собирается функцией *_context из posts.views одним переходом в поток
+через sync_to_async. Параллельных запросов к БД это не даёт — в Django
+4.2 async ORM тоже выполняет каждый запрос в потоке через sync_to_async.
+Выигрыш в другом: пока запрос ждёт БД, медленного клиента или сборку
+страницы другим запросом (cached_feed ждёт её на asyncio.Event), event
+loop обслуживает остальные соединения, не занимая по потоку на каждое.
+'''
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import render
+
+from posts import views
+from posts.conditional import (
+    conditional, feed_validators, post_validators
+)
+from posts.page_cache import (
+    cached_feed, follow_scopes, group_scopes, index_scopes, profile_scopes
+)
+
+
+async def get_user(request):
+    '''Загружает request.user из сессии вне event loop.'''
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+def login_required(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await get_user(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def render_page(request, template, build_context, *args):
+    '''Контекст из posts.views и рендеринг за один sync_to_async.'''
+    def page():
+        return render(request, template, build_context(request, *args))
+    return await sync_to_async(page)()
+
+
+@conditional(feed_validators(index_scopes))
+@cached_feed(index_scopes)
+async def index(request):
+    return await render_page(
+        request, 'posts/index.html', views.index_context
+    )
+
+
+@conditional(feed_validators(group_scopes))
+@cached_feed(group_scopes)
+async def group_posts(request, slug):
+    return await render_page(
+        request, 'posts/group_list.html', views.group_posts_context, slug
+    )
+
+
+@conditional(feed_validators(profile_scopes))
+@cached_feed(profile_scopes)
+async def profile(request, username):
+    return await render_page(
+        request, 'posts/profile.html', views.profile_context, username
+    )
+
+
+@conditional(post_validators)
+async def post_detail(request, post_id):
+    return await render_page(
+        request, 'posts/post_detail.html', views.post_detail_context, post_id
+    )
+
+
+@login_required
+@conditional(feed_validators(follow_scopes))
+@cached_feed(follow_scopes)
+async def follow_index(request):
+    return await render_page(
+        request, 'posts/follow.html', views.follow_index_context
+    )
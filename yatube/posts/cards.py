@@ -0,0 +1,47 @@
+import time
+
+from django.core.cache import cache
+
+CARD_TIMEOUT = 60 * 60 * 24
+
+
+def version_key(kind, pk):
+    return f'post_card:{kind}:{pk}'
+
+
+def bump_card_version(kind, pk):
+    '''Новая версия делает все закешированные карточки объекта устаревшими.
+
+    Версия — время в наносекундах, поэтому после вытеснения ключа
+    из кеша старая версия не может повториться.
+    '''
+    cache.set(version_key(kind, pk), time.time_ns(), None)
+
+
+def card_keys(post):
+    return (
+        version_key('post', post.pk),
+        version_key('group', post.group_id),
+        version_key('author', post.author_id),
+    )
+
+
+def attach_card_versions(page_obj):
+    '''Проставляет постам страницы card_version одним запросом к кешу.
+
+    Время жизни фрагмента карточки шаблон берёт из page_obj.card_timeout.
+    '''
+    posts = list(page_obj.object_list)
+    keys = {key for post in posts for key in card_keys(post)}
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys - versions.keys()}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    for post in posts:
+        post.card_version = '.'.join(
+            str(versions[key]) for key in card_keys(post)
+        )
+    page_obj.object_list = posts
+    page_obj.card_timeout = CARD_TIMEOUT
+    return page_obj
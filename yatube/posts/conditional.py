@@ -0,0 +1,127 @@
+'''Условные GET-запросы: 304 Not Modified без рендеринга страницы.
+
+Валидаторы считаются до вызова view и дёшево: для лент — по поколениям
+page_cache (только кеш), для страницы поста — одним запросом к БД.
+ETag зависит от того, кто смотрит страницу: у автора и гостя она разная.
+'''
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth import SESSION_KEY
+from django.db.models import Max
+from django.utils.cache import (
+    get_conditional_response, patch_vary_headers, quote_etag
+)
+from django.utils.http import http_date
+
+from posts.models import Post
+from posts.page_cache import SITE, generation_values
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def viewer(request):
+    '''id пользователя из сессии, без загрузки самого пользователя.'''
+    if not hasattr(request, 'session'):
+        return ''
+    return request.session.get(SESSION_KEY, '')
+
+
+def make_etag(*parts):
+    return quote_etag(
+        hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+    )
+
+
+def feed_validators(scopes_for):
+    '''ETag и Last-Modified ленты по поколениям её scopes.'''
+    def validators(request, *args, **kwargs):
+        values = generation_values(
+            (SITE, *scopes_for(request, *args, **kwargs))
+        )
+        etag = make_etag(
+            *values, viewer(request), request.get_full_path()
+        )
+        return etag, max(values) / 10 ** 9
+    return validators
+
+
+def post_validators(request, post_id):
+    '''ETag и Last-Modified страницы поста одним запросом.
+
+    Кроме самого поста и комментариев на странице выводятся число постов
+    автора, имена и группы — их изменения учитывает поколение SITE.
+    '''
+    row = Post.objects.filter(pk=post_id).annotate(
+        last_comment=Max('comments__updated_at')
+    ).values_list(
+        'updated_at', 'last_comment', 'comments_count',
+        'author__profile__posts_count'
+    ).first()
+    if row is None:
+        return None, None
+    updated_at, last_comment, *counts = row
+    site, = generation_values((SITE,))
+    etag = make_etag(
+        updated_at.isoformat(), last_comment, *counts, site,
+        viewer(request)
+    )
+    modified = max(filter(None, (updated_at, last_comment)))
+    return etag, max(modified.timestamp(), site / 10 ** 9)
+
+
+def not_modified(request, validators, *args, **kwargs):
+    '''Ответ 304/412 или None, если страницу надо собрать.'''
+    etag, last_modified = validators(request, *args, **kwargs)
+    return (
+        get_conditional_response(
+            request, etag=etag,
+            last_modified=last_modified and int(last_modified)
+        ),
+        etag,
+        last_modified,
+    )
+
+
+def add_validators(response, etag, last_modified):
+    if etag:
+        response.headers.setdefault('ETag', etag)
+    if last_modified and not response.has_header('Last-Modified'):
+        response.headers['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def conditional(validators):
+    '''Аналог django.views.decorators.http.condition для sync и async view.
+
+    validators(request, *args, **kwargs) возвращает (etag, timestamp)
+    и вызывается один раз на запрос.
+    '''
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in SAFE_METHODS:
+                    return await view(request, *args, **kwargs)
+                response, etag, last_modified = await sync_to_async(
+                    not_modified
+                )(request, validators, *args, **kwargs)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return add_validators(response, etag, last_modified)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                return view(request, *args, **kwargs)
+            response, etag, last_modified = not_modified(
+                request, validators, *args, **kwargs
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return add_validators(response, etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import Comment, Follow, Post, Profile, User
+
+BATCH_SIZE = 2000
+
+
+def count_subquery(queryset, field):
+    '''Коррелированный COUNT по полю field для UPDATE ... SET.'''
+    return Coalesce(Subquery(
+        queryset.order_by().values(field)
+        .annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def profile_of(user):
+    '''Профиль пользователя со счётчиками.
+
+    Пользователи из loaddata и bulk_create создаются без сигнала
+    create_profile; их профиль создаётся при первом обращении со
+    счётчиками, посчитанными по БД.
+    '''
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        pass
+    user.profile, _ = Profile.objects.get_or_create(user=user, defaults={
+        'posts_count': Post.objects.filter(author=user).count(),
+        'followers_count': Follow.objects.filter(author=user).count(),
+        'following_count': Follow.objects.filter(user=user).count(),
+    })
+    return user.profile
+
+
+def rebuild_counters():
+    '''Пересчитывает все денормализованные счётчики с нуля.
+
+    Возвращает число созданных профилей и пересчитанных строк.
+    '''
+    with transaction.atomic():
+        missing = User.objects.filter(profile__isnull=True)
+        created = len(Profile.objects.bulk_create(
+            Profile(user_id=pk)
+            for pk in missing.values_list('pk', flat=True).iterator(
+                chunk_size=BATCH_SIZE
+            )
+        ))
+        profiles = Profile.objects.update(
+            posts_count=count_subquery(
+                Post.objects.filter(author=OuterRef('user')), 'author'
+            ),
+            followers_count=count_subquery(
+                Follow.objects.filter(author=OuterRef('user')), 'author'
+            ),
+            following_count=count_subquery(
+                Follow.objects.filter(user=OuterRef('user')), 'user'
+            ),
+        )
+        posts = Post.objects.update(comments_count=count_subquery(
+            Comment.objects.filter(post=OuterRef('pk')), 'post'
+        ))
+    return created, profiles, posts
@@ -0,0 +1,40 @@
+'''Анонсы постов: первые EXCERPT_WORDS слов текста и число слов.
+
+Считаются при сохранении поста, а не при каждом рендеринге карточки:
+truncatewords разбивает на слова весь текст, и для длинных постов это
+большая часть времени рендеринга.
+'''
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 30
+BATCH_SIZE = 2000
+
+
+def summarize(text):
+    '''Поля анонса, совпадающие с выводом фильтра truncatewords:30.'''
+    return {
+        'excerpt': Truncator(text).words(EXCERPT_WORDS, truncate=' …'),
+        'word_count': len(text.split()),
+    }
+
+
+def backfill(posts, batch_size=BATCH_SIZE):
+    '''Пересчитывает анонсы постов queryset пачками по id.
+
+    Возвращает число постов.
+    '''
+    total = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            posts.filter(pk__gt=last_pk).order_by('pk')
+            .only('pk', 'text')[:batch_size]
+        )
+        if not batch:
+            return total
+        for post in batch:
+            for field, value in summarize(post.text).items():
+                setattr(post, field, value)
+        posts.model.objects.bulk_update(batch, ('excerpt', 'word_count'))
+        total += len(batch)
+        last_pk = batch[-1].pk
@@ -0,0 +1,183 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+
+from posts.models import FeedItem, Follow, Post, PostQuerySet, Profile
+from posts.paginators import POST_ORDERING
+
+FEED_ORDERING = ('-pub_date', '-post_id')
+BATCH_SIZE = 1000
+
+
+def feed_item(user_id, post):
+    return FeedItem(
+        user_id=user_id,
+        post_id=post.pk,
+        author_id=post.author_id,
+        pub_date=post.pub_date
+    )
+
+
+def is_fanout_author(author_id):
+    '''Авторам с большим числом подписчиков лента не рассылается.'''
+    return not Profile.objects.filter(
+        user_id=author_id,
+        followers_count__gt=settings.FEED_FANOUT_LIMIT
+    ).exists()
+
+
+def push_post(post):
+    '''Fan-out on write: кладёт новый пост в ленты подписчиков автора.'''
+    if not is_fanout_author(post.author_id):
+        return
+    follower_ids = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    with transaction.atomic(savepoint=False):
+        FeedItem.objects.bulk_create(
+            (
+                feed_item(user_id, post)
+                for user_id in follower_ids.iterator(chunk_size=BATCH_SIZE)
+            ),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True
+        )
+
+
+def backfill(follow):
+    '''Добавляет в ленту подписчика уже опубликованные посты автора.'''
+    backfill_authors(follow.user_id, [follow.author_id])
+
+
+def backfill_authors(user_id, author_ids):
+    '''backfill для подписки сразу на многих авторов одним запросом.
+
+    Посты авторов в pull-режиме не копируются: их лента читает сама.
+    '''
+    copy_posts(user_id, Post.objects.filter(
+        author_id__in=author_ids,
+        author__profile__followers_count__lte=settings.FEED_FANOUT_LIMIT
+    ))
+
+
+def copy_posts(user_id, posts):
+    posts = posts.only('pk', 'author_id', 'pub_date')
+    with transaction.atomic(savepoint=False):
+        FeedItem.objects.bulk_create(
+            (
+                feed_item(user_id, post)
+                for post in posts.iterator(chunk_size=BATCH_SIZE)
+            ),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True
+        )
+
+
+def prune(follow):
+    '''Убирает из ленты посты автора, от которого отписались.'''
+    prune_authors(follow.user_id, [follow.author_id])
+
+
+def prune_authors(user_id, author_ids):
+    FeedItem.objects.filter(
+        user_id=user_id, author_id__in=author_ids
+    ).delete()
+
+
+def rebuild_feeds():
+    '''Заново материализует все ленты одним INSERT ... SELECT.
+
+    Нужна после массовой загрузки через bulk_create, когда сигналы
+    fan-out не срабатывали. Авторы в pull-режиме пропускаются.
+    '''
+    tables = {
+        model.__name__: connection.ops.quote_name(model._meta.db_table)
+        for model in (FeedItem, Follow, Post, Profile)
+    }
+    with transaction.atomic(), connection.cursor() as cursor:
+        FeedItem.objects.all().delete()
+        cursor.execute(
+            f'INSERT INTO {tables["FeedItem"]} '
+            f'(user_id, post_id, author_id, pub_date) '
+            f'SELECT follow.user_id, post.id, post.author_id, post.pub_date '
+            f'FROM {tables["Follow"]} follow '
+            f'JOIN {tables["Profile"]} profile '
+            f'ON profile.user_id = follow.author_id '
+            f'JOIN {tables["Post"]} post ON post.author_id = follow.author_id '
+            f'WHERE profile.followers_count <= %s',
+            [settings.FEED_FANOUT_LIMIT]
+        )
+        return cursor.rowcount
+
+
+def pull_author_ids(user):
+    '''Авторы из подписок user, посты которых не рассылаются.'''
+    return list(Follow.objects.filter(
+        user=user,
+        author__profile__followers_count__gt=settings.FEED_FANOUT_LIMIT
+    ).values_list('author_id', flat=True))
+
+
+def follow_feed(user):
+    '''Лента подписок и порядок для пагинатора.
+
+    Обычно это один диапазонный проход по индексу FeedItem. Посты
+    авторов в pull-режиме не материализуются: если такие авторы есть в
+    подписках, лента читается из Post — посты из FeedItem подписчика
+    плюс посты pull-авторов, — и запрос ленты ничего не пишет в БД.
+    '''
+    pull_ids = pull_author_ids(user)
+    if pull_ids:
+        return Post.objects.for_list().filter(
+            Q(pk__in=FeedItem.objects.filter(user=user).values('post_id'))
+            | Q(author_id__in=pull_ids)
+        ), POST_ORDERING
+    return FeedItem.objects.filter(user=user).select_related(*(
+        f'post__{field}' for field in PostQuerySet.list_related
+    )).only('pub_date', 'post', *(
+        f'post__{field}'
+        for field in PostQuerySet.list_related + PostQuerySet.list_fields
+    )), FEED_ORDERING
+
+
+def feed_posts(items):
+    '''Посты страницы ленты из записей FeedItem или самих постов.'''
+    return [
+        item.post if isinstance(item, FeedItem) else item for item in items
+    ]
+
+
+def switch_modes(author_ids, delta):
+    '''Переключает авторов, чьё число подписчиков пересекло
+    FEED_FANOUT_LIMIT после сдвига счётчика на delta (±1).
+
+    Ставший популярным автор убирается из материализованных лент — его
+    посты читаются при запросе ленты. Автору, вернувшемуся под порог,
+    посты заново раскладываются по лентам всех подписчиков.
+    '''
+    limit = settings.FEED_FANOUT_LIMIT
+    crossed = list(Profile.objects.filter(
+        user_id__in=author_ids,
+        followers_count=limit + 1 if delta > 0 else limit
+    ).values_list('user_id', flat=True))
+    if not crossed:
+        return
+    if delta > 0:
+        FeedItem.objects.filter(author_id__in=crossed).delete()
+        return
+    tables = {
+        model.__name__: connection.ops.quote_name(model._meta.db_table)
+        for model in (FeedItem, Follow, Post)
+    }
+    placeholders = ', '.join(['%s'] * len(crossed))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {tables["FeedItem"]} '
+            f'(user_id, post_id, author_id, pub_date) '
+            f'SELECT follow.user_id, post.id, post.author_id, post.pub_date '
+            f'FROM {tables["Follow"]} follow '
+            f'JOIN {tables["Post"]} post ON post.author_id = follow.author_id '
+            f'WHERE follow.author_id IN ({placeholders}) '
+            f'ON CONFLICT DO NOTHING',
+            crossed
+        )
@@ -0,0 +1,145 @@
+'''Пакетные подписки и отписки: сотни авторов за несколько запросов.
+
+Авторы находятся одним filter(username__in=...), подписки пишутся и
+удаляются одним запросом на пачку. Массовые запись и удаление не
+вызывают сигналы Follow, поэтому счётчики, ленты и кеш страниц
+обновляются здесь сразу для всей пачки — так же, как обработчики в
+signals.py для одной подписки, но по строкам, которые изменил именно
+этот запрос.
+'''
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from posts import feeds, page_cache
+from posts.models import Follow, Profile, User
+
+BATCH_LIMIT = 1000
+BATCH_SIZE = 1000
+
+CREATED = 'created'
+DELETED = 'deleted'
+EXISTS = 'exists'
+NOT_FOLLOWING = 'not_following'
+NOT_FOUND = 'not_found'
+SELF = 'self'
+
+
+def find_authors(usernames):
+    '''Имя → id для существующих пользователей одним запросом.'''
+    return dict(
+        User.objects.filter(username__in=set(usernames))
+        .values_list('username', 'pk')
+    )
+
+
+def write_follows(statement, user, author_ids):
+    '''Выполняет statement(user_id, пачка) по BATCH_SIZE авторов и
+    возвращает id авторов из RETURNING — только свои строки.'''
+    author_ids = list(author_ids)
+    changed = set()
+    with connection.cursor() as cursor:
+        for start in range(0, len(author_ids), BATCH_SIZE):
+            cursor.execute(*statement(
+                user.pk, author_ids[start:start + BATCH_SIZE]
+            ))
+            changed.update(author_id for author_id, in cursor.fetchall())
+    return changed
+
+
+def insert_follows(user, author_ids):
+    '''INSERT ... ON CONFLICT DO NOTHING по author_user_unique.
+
+    bulk_create(ignore_conflicts=True) не сообщает, какие строки вставил:
+    подписку, созданную параллельным запросом между проверкой и вставкой,
+    счётчики учли бы дважды. RETURNING отдаёт только свои строки.
+    '''
+    table = connection.ops.quote_name(Follow._meta.db_table)
+    return write_follows(
+        lambda user_id, chunk: (
+            f'INSERT INTO {table} (user_id, author_id) VALUES '
+            + ', '.join(['(%s, %s)'] * len(chunk))
+            + ' ON CONFLICT DO NOTHING RETURNING author_id',
+            [value for pk in chunk for value in (user_id, pk)]
+        ),
+        user, author_ids
+    )
+
+
+def delete_follows(user, author_ids):
+    '''DELETE ... RETURNING одним запросом на пачку.
+
+    QuerySet.delete() отправил бы post_delete для каждой подписки, а
+    сигналы здесь заменяет пакетное обновление счётчиков и лент.
+    '''
+    table = connection.ops.quote_name(Follow._meta.db_table)
+    return write_follows(
+        lambda user_id, chunk: (
+            f'DELETE FROM {table} WHERE user_id = %s AND author_id IN ('
+            + ', '.join(['%s'] * len(chunk)) + ') RETURNING author_id',
+            [user_id, *chunk]
+        ),
+        user, author_ids
+    )
+
+
+def shift_followers(author_ids, delta):
+    Profile.objects.filter(user_id__in=author_ids).update(
+        followers_count=Greatest(F('followers_count') + delta, 0)
+    )
+
+
+def shift_following(user, delta):
+    Profile.objects.filter(user=user).update(
+        following_count=Greatest(F('following_count') + delta, 0)
+    )
+
+
+def follow_many(user, usernames):
+    '''Подписывает user на авторов; статус для каждого имени по порядку.'''
+    usernames = list(dict.fromkeys(usernames))
+    authors = find_authors(usernames)
+    with transaction.atomic():
+        created = insert_follows(user, (
+            pk for pk in authors.values() if pk != user.pk
+        ))
+        if created:
+            shift_followers(created, 1)
+            shift_following(user, len(created))
+            feeds.switch_modes(created, 1)
+            feeds.backfill_authors(user.pk, created)
+            page_cache.invalidate_follows(user, [
+                username for username, pk in authors.items()
+                if pk in created
+            ])
+
+    def status(username):
+        if username not in authors:
+            return NOT_FOUND
+        if authors[username] == user.pk:
+            return SELF
+        return CREATED if authors[username] in created else EXISTS
+    return [(username, status(username)) for username in usernames]
+
+
+def unfollow_many(user, usernames):
+    '''Отписывает user от авторов; статус для каждого имени по порядку.'''
+    usernames = list(dict.fromkeys(usernames))
+    authors = find_authors(usernames)
+    with transaction.atomic():
+        removed = delete_follows(user, authors.values())
+        if removed:
+            shift_followers(removed, -1)
+            shift_following(user, -len(removed))
+            feeds.switch_modes(removed, -1)
+            feeds.prune_authors(user.pk, removed)
+            page_cache.invalidate_follows(user, [
+                username for username, pk in authors.items()
+                if pk in removed
+            ])
+
+    def status(username):
+        if username not in authors:
+            return NOT_FOUND
+        return DELETED if authors[username] in removed else NOT_FOLLOWING
+    return [(username, status(username)) for username in usernames]
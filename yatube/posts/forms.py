@@ -1,5 +1,6 @@
 from django import forms
 
+from posts import images
 from posts.models import Comment, Post
 
 
@@ -24,6 +25,11 @@ class PostForm(forms.ModelForm):
             raise forms.ValidationError('Пусто, добавьте текст!')
         return data
 
+    def clean_image(self):
+        ''' Валидатор картинки: лимиты проверяются по заголовку,
+        слишком большие оригиналы уменьшаются при загрузке'''
+        return images.clean(self.cleaned_data['image'])
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,100 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image
+
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 85},
+}
+
+
+def source(upload):
+    '''Путь к загрузке на диске или сам файловый объект.'''
+    if hasattr(upload, 'temporary_file_path'):
+        return upload.temporary_file_path()
+    upload.seek(0)
+    return upload
+
+
+def check_size(upload):
+    '''Размер файла проверяется до декодирования картинки.'''
+    if upload.size > settings.POST_IMAGE_MAX_BYTES:
+        raise ValidationError(
+            'Файл больше %(limit)s МБ.',
+            code='file_too_large',
+            params={'limit': settings.POST_IMAGE_MAX_BYTES // 2 ** 20}
+        )
+
+
+def check_header(image):
+    '''Формат и размер в пикселях по заголовку, без декодирования.'''
+    if image.format not in settings.POST_IMAGE_FORMATS:
+        raise ValidationError(
+            'Формат %(format)s не поддерживается.',
+            code='invalid_format',
+            params={'format': image.format}
+        )
+    width, height = image.size
+    if width * height > settings.POST_IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            'Картинка больше %(limit)s мегапикселей.',
+            code='too_many_pixels',
+            params={'limit': settings.POST_IMAGE_MAX_PIXELS // 10 ** 6}
+        )
+
+
+def clean(upload):
+    '''Проверки загруженной картинки поста; большие оригиналы
+    уменьшаются. Общие для формы и API.'''
+    if not upload or not hasattr(upload, 'image'):
+        return upload
+    check_size(upload)
+    check_header(upload.image)
+    if needs_downscale(upload.image):
+        return downscale(upload)
+    return upload
+
+
+def needs_downscale(image):
+    return max(image.size) > settings.POST_IMAGE_MAX_SIDE
+
+
+def downscale(upload):
+    '''Уменьшает картинку до POST_IMAGE_MAX_SIDE по большей стороне.
+
+    С reducing_gap=1.0 thumbnail() вызывает draft() под итоговый размер:
+    JPEG декодируется сразу в уменьшенном масштабе, поэтому пиковая память
+    зависит от итогового размера, а не от исходного. Результат пишется во
+    временный файл.
+    '''
+    side = settings.POST_IMAGE_MAX_SIDE
+    with Image.open(source(upload)) as image:
+        if getattr(image, 'is_animated', False):
+            raise ValidationError(
+                'Анимация больше %(limit)s пикселей по стороне.',
+                code='too_large_animation',
+                params={'limit': side}
+            )
+        image_format = image.format
+        options = dict(SAVE_OPTIONS.get(image_format, {}))
+        if 'exif' in image.info:
+            options['exif'] = image.info['exif']
+        image.thumbnail((side, side), Image.LANCZOS, reducing_gap=1.0)
+        result = tempfile.NamedTemporaryFile(
+            suffix=os.path.splitext(upload.name)[1],
+            dir=settings.FILE_UPLOAD_TEMP_DIR
+        )
+        image.save(result, image_format, **options)
+    size = result.tell()
+    result.seek(0)
+    return UploadedFile(
+        result,
+        name=upload.name,
+        content_type=Image.MIME.get(image_format),
+        size=size
+    )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.excerpts import BATCH_SIZE, backfill
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает анонсы и число слов постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        total = backfill(Post.objects.all(), options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано анонсов: {total}'
+        ))
@@ -0,0 +1,62 @@
+import random
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from core.benchmarks import benchmark_database
+from posts.seed import seed
+
+REQUESTS = {
+    'HTML /': ('/', True),
+    'HTML / из кеша страниц': ('/', False),
+    'API /api/v1/posts/': ('/api/v1/posts/', True),
+    'API ?fields=id,author,excerpt': (
+        '/api/v1/posts/?fields=id,author,excerpt', True
+    ),
+    'API 304 If-None-Match': ('/api/v1/posts/', False),
+}
+
+
+class Command(BaseCommand):
+    help = 'Пропускная способность списка постов: HTML против API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--posts', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            seed(
+                random.Random(1), users=200, groups=10,
+                posts=options['posts'], comments=options['posts'],
+                follows=10, prefix='bench'
+            )
+            client = Client()
+            results = {}
+            for name, (path, cold) in REQUESTS.items():
+                headers = {}
+                if name.startswith('API 304'):
+                    headers['HTTP_IF_NONE_MATCH'] = client.get(path)['ETag']
+                results[name] = self.throughput(
+                    client, path, cold, headers, options['seconds']
+                )
+        html = results['HTML /']
+        for name, rate in results.items():
+            self.stdout.write(
+                f'{name:<32} {rate:8.0f} req/s  x{rate / html:.1f}'
+            )
+
+    def throughput(self, client, path, cold, headers, seconds):
+        '''Запросы в секунду в один поток; cold — без кеша страниц.'''
+        count = 0
+        elapsed = 0.0
+        while elapsed < seconds:
+            if cold:
+                cache.clear()
+            started = time.perf_counter()
+            client.get(path, **headers)
+            elapsed += time.perf_counter() - started
+            count += 1
+        return count / elapsed
@@ -0,0 +1,100 @@
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.benchmarks import benchmark_database
+from posts.models import Post, Profile
+from yatube.env import cache_from_url
+
+User = get_user_model()
+
+
+def measure(func):
+    '''Время в миллисекундах и число SQL-запросов одного прогона.'''
+    queries = []
+
+    def count(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        started = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - started) * 1000
+    return elapsed, len(queries)
+
+
+class Command(BaseCommand):
+    help = (
+        'Подписка на авторов и выборка постов пачкой: '
+        'по одному запросу на элемент против одного пакетного запроса'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1000)
+        parser.add_argument(
+            '--cache', default='locmem://',
+            help='URL кеша: каждая подписка меняет поколения лент в нём'
+        )
+
+    def handle(self, *args, **options):
+        items = options['items']
+        with tempfile.TemporaryDirectory() as directory:
+            caches = {'default': cache_from_url(options['cache'], directory)}
+            with benchmark_database(), override_settings(CACHES=caches):
+                results = self.run(items)
+        self.stdout.write(f'{items} элементов, кеш {options["cache"]}')
+        for name, (elapsed, queries) in results.items():
+            self.stdout.write(
+                f'{name:<20} {elapsed:9.0f} мс  {queries:6} запросов'
+            )
+
+    def run(self, items):
+        reader, usernames, post_ids = self.fill(items)
+        client = APIClient()
+        client.force_login(reader)
+        return {
+            'подписка по одной': measure(lambda: [
+                client.get(reverse('posts:profile_follow', args=(name,)))
+                for name in usernames
+            ]),
+            'отписка по одной': measure(lambda: [
+                client.get(reverse('posts:profile_unfollow', args=(name,)))
+                for name in usernames
+            ]),
+            'подписка пачкой': measure(lambda: client.post(
+                '/api/v1/follow/batch/', {'follow': usernames}, format='json'
+            )),
+            'отписка пачкой': measure(lambda: client.post(
+                '/api/v1/follow/batch/', {'unfollow': usernames},
+                format='json'
+            )),
+            'посты по одному': measure(lambda: [
+                client.get(f'/api/v1/posts/{pk}/') for pk in post_ids
+            ]),
+            'посты пачкой': measure(lambda: client.get(
+                '/api/v1/posts/batch/', {'ids': ','.join(map(str, post_ids))}
+            )),
+        }
+
+    def fill(self, items):
+        reader = User.objects.create_user(username='bench-reader')
+        authors = User.objects.bulk_create(
+            User(username=f'bench-{number}') for number in range(items)
+        )
+        Profile.objects.bulk_create(Profile(user=author) for author in authors)
+        posts = Post.objects.bulk_create(
+            Post(text=f'Пост {author.username}', author=author)
+            for author in authors
+        )
+        return (
+            reader,
+            [author.username for author in authors],
+            [post.pk for post in posts],
+        )
@@ -0,0 +1,106 @@
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmarks import benchmark_database, percentile
+from posts.models import Group, Post
+from yatube.env import cache_from_url
+
+User = get_user_model()
+AUTHORS = 10
+POSTS = 300
+
+
+def count_queries(counter):
+    def wrapper(execute, sql, params, many, context):
+        counter.append(sql)
+        return execute(sql, params, many, context)
+    return wrapper
+
+
+def worker(urls, requests, seed):
+    '''Один процесс gunicorn: страницы без запросов к БД — попадания.'''
+    connections.close_all()
+    rng = random.Random(seed)
+    client = Client()
+    hits = 0
+    latencies = []
+    for _ in range(requests):
+        queries = []
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_queries(queries)):
+            client.get(rng.choice(urls))
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += not queries
+    return hits, latencies
+
+
+class Command(BaseCommand):
+    help = 'Доля попаданий и p95 для N процессов: общий кеш против LocMem'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--requests', type=int, default=300)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            database = os.path.join(directory, 'bench.sqlite3')
+            with benchmark_database(database):
+                urls = self.fill()
+                for url in ('locmem://', f'file://{directory}/cache'):
+                    with override_settings(
+                        CACHES={'default': cache_from_url(url, directory)}
+                    ):
+                        self.report(url, urls, options)
+
+    def fill(self):
+        authors = [
+            User.objects.create_user(username=f'bench{number}')
+            for number in range(AUTHORS)
+        ]
+        groups = [
+            Group.objects.create(
+                title=f'Группа {number}',
+                slug=f'group{number}',
+                description='Группа'
+            )
+            for number in range(3)
+        ]
+        for number in range(POSTS):
+            Post.objects.create(
+                text=f'Пост {number}',
+                author=authors[number % AUTHORS],
+                group=groups[number % len(groups)]
+            )
+        index = reverse('posts:index')
+        return (
+            [f'{index}?page={page}' for page in range(1, 11)]
+            + [reverse('posts:group_list', kwargs={'slug': group.slug})
+               for group in groups]
+            + [reverse('posts:profile', kwargs={'username': author})
+               for author in authors]
+        )
+
+    def report(self, url, urls, options):
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with context.Pool(options['workers']) as pool:
+            results = pool.starmap(worker, [
+                (urls, options['requests'], seed)
+                for seed in range(options['workers'])
+            ])
+        hits = sum(result[0] for result in results)
+        latencies = [value for result in results for value in result[1]]
+        self.stdout.write(
+            f'{url:<40} процессов: {options["workers"]}, '
+            f'попаданий: {hits / len(latencies):.0%}, '
+            f'p95: {percentile(latencies, 95):.2f}ms'
+        )
@@ -0,0 +1,72 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks import benchmark_database, summary, timings
+from posts.models import Group, Post
+from posts.seed import text
+from posts.views import NUMBER_OF_POST_ON_PAGES
+
+User = get_user_model()
+POST_SIZE = 10 * 1024
+CARDS = {
+    'truncatewords:30': (
+        '{% for post in posts %}{{ post.text|truncatewords:30 }}{% endfor %}'
+    ),
+    'сохранённый анонс': (
+        '{% for post in posts %}{{ post.excerpt }}{% endfor %}'
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Рендеринг анонсов страницы из 10 постов по 10 КБ: '
+        'truncatewords против сохранённого анонса'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            url = self.fill()
+            posts = list(Post.objects.all())
+            for name, source in CARDS.items():
+                template = engines['django'].from_string(source)
+                p50, p95 = summary(timings(
+                    lambda: template.render({'posts': posts}),
+                    options['repeat']
+                ))
+                self.stdout.write(
+                    f'{name:<18} p50 {p50:.3f}ms, p95 {p95:.3f}ms'
+                )
+            client = Client()
+
+            def cold_page():
+                cache.clear()
+                client.get(url)
+
+            p50, p95 = summary(timings(cold_page, options['repeat'] // 4))
+        self.stdout.write(
+            f'страница с холодными карточками: p50 {p50:.2f}ms, '
+            f'p95 {p95:.2f}ms'
+        )
+
+    def fill(self):
+        rng = random.Random(1)
+        group = Group.objects.create(
+            title='Группа', slug='bench', description='Группа'
+        )
+        author = User.objects.create_user(username='bench')
+        for _ in range(NUMBER_OF_POST_ON_PAGES):
+            body = text(rng, POST_SIZE // 6)
+            Post.objects.create(
+                text=body[:POST_SIZE], author=author, group=group
+            )
+        return reverse('posts:group_list', kwargs={'slug': group.slug})
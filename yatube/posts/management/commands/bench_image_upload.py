@@ -0,0 +1,106 @@
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from django import forms
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from posts.forms import PostForm
+
+CARD_SIZE = (960, 339)
+
+
+def peak_rss():
+    '''Пиковый RSS процесса (VmHWM) в МБ.'''
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def reset_peak_rss():
+    '''Сбрасывает VmHWM до текущего RSS (Linux).'''
+    with open('/proc/self/clear_refs', 'w') as clear_refs:
+        clear_refs.write('5')
+
+
+def make_image(path, width, height):
+    noise = Image.effect_noise((width // 4, height // 4), 40)
+    image = Image.merge('RGB', (noise, noise.rotate(90), noise))
+    image.resize((width, height)).save(path, 'JPEG', quality=85)
+
+
+def upload(path):
+    '''Загрузка, как её сохраняет TemporaryFileUploadHandler.'''
+    result = TemporaryUploadedFile(
+        'photo.jpg', 'image/jpeg', os.path.getsize(path), None
+    )
+    with open(path, 'rb') as source:
+        shutil.copyfileobj(source, result)
+    result.seek(0)
+    return result
+
+
+def render_card(image_file):
+    '''То, что делает sorl при первом рендере карточки.'''
+    image_file.seek(0)
+    with Image.open(io.BytesIO(image_file.read())) as image:
+        image.convert('RGB').resize(CARD_SIZE)
+
+
+def before(path):
+    render_card(forms.ImageField().clean(upload(path)))
+
+
+def after(path):
+    form = PostForm(data={'text': 'Тест'}, files={'image': upload(path)})
+    form.is_valid()
+    render_card(form.cleaned_data['image'])
+
+
+def measure(scenario, path, queue):
+    reset_peak_rss()
+    baseline = peak_rss()
+    scenario(path)
+    queue.put(peak_rss() - baseline)
+
+
+def in_child(target, *args):
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    process = context.Process(target=target, args=(*args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def generate(path, width, height, queue):
+    make_image(path, width, height)
+    queue.put(None)
+
+
+class Command(BaseCommand):
+    help = 'Пиковый RSS при загрузке картинки: без ограничений и с ними'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--megapixels', type=int, default=50)
+
+    def handle(self, *args, **options):
+        height = int((options['megapixels'] * 10 ** 6 / 1.5) ** 0.5)
+        width = int(height * 1.5)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'photo.jpg')
+            in_child(generate, path, width, height)
+            self.stdout.write(
+                f'{width}x{height}, '
+                f'{os.path.getsize(path) / 2 ** 20:.1f} МБ'
+            )
+            for name, scenario in (('before', before), ('after', after)):
+                peak = in_child(measure, scenario, path)
+                self.stdout.write(f'{name:>6}: пик RSS +{peak:.0f} МБ')
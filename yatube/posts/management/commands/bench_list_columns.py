@@ -0,0 +1,87 @@
+import tracemalloc
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks import benchmark_database
+from posts.models import Group, Post, PostQuerySet
+from posts.views import NUMBER_OF_POST_ON_PAGES
+
+User = get_user_model()
+
+
+def full_rows(queryset):
+    '''Ленты до отложенной загрузки: строки постов целиком.'''
+    return queryset.select_related(*queryset.list_related)
+
+
+def row_bytes(queryset):
+    '''Объём строк результата, которые СУБД отдала приложению.'''
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return sum(
+            len(value if isinstance(value, bytes) else str(value).encode())
+            for row in cursor.fetchall() for value in row
+            if value is not None
+        )
+
+
+def peak_memory(func):
+    cache.clear()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class Command(BaseCommand):
+    help = (
+        'Байты строк и пик памяти на запрос страницы ленты: '
+        'полные строки постов против for_list() без текста'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--post-size', type=int, default=100 * 1024)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            url = self.fill(options['post_size'])
+            client = Client()
+            client.get(url)
+            modes = {
+                'полные строки': mock.patch.object(
+                    PostQuerySet, 'for_list', full_rows
+                ),
+                'for_list()': mock.patch.object(
+                    PostQuerySet, 'for_list', PostQuerySet.for_list
+                ),
+            }
+            for name, patch in modes.items():
+                with patch:
+                    page = Post.objects.for_list()[:NUMBER_OF_POST_ON_PAGES]
+                    transferred = row_bytes(page)
+                    memory = peak_memory(lambda: client.get(url))
+                self.stdout.write(
+                    f'{name:<14} строки: {transferred / 1024:8.1f} КБ, '
+                    f'пик памяти запроса: {memory / 1024:8.1f} КБ'
+                )
+
+    def fill(self, post_size):
+        group = Group.objects.create(
+            title='Группа', slug='bench', description='Группа'
+        )
+        author = User.objects.create_user(username='bench')
+        for _ in range(NUMBER_OF_POST_ON_PAGES):
+            Post.objects.create(
+                text=('Слово ' * post_size)[:post_size],
+                author=author, group=group
+            )
+        return reverse('posts:index')
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+
+from core.benchmarks import benchmark_database, summary, timings
+from posts.models import Post
+from posts.paginators import (
+    CURSOR_NEXT, POST_ORDERING, CursorPaginator, encode_cursor
+)
+from posts.views import NUMBER_OF_POST_ON_PAGES
+
+User = get_user_model()
+BATCH_SIZE = 5000
+PAGES = (1, 10, 100, 1000, 10000)
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает OFFSET- и cursor-пагинацию ленты на глубоких страницах'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=max(PAGES))
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        total = options['pages'] * NUMBER_OF_POST_ON_PAGES
+        with benchmark_database():
+            self.fill(total)
+            self.report(options['pages'], options['repeat'])
+
+    def fill(self, total):
+        author = User.objects.create_user(username='bench')
+        for start in range(0, total, BATCH_SIZE):
+            Post.objects.bulk_create(
+                Post(text=f'Пост {number}', author=author)
+                for number in range(start, min(start + BATCH_SIZE, total))
+            )
+
+    def report(self, last_page, repeat):
+        post_list = Post.objects.all()
+        self.stdout.write(
+            f'{"page":>8} {"offset p50":>12} {"offset p95":>12} '
+            f'{"cursor p50":>12} {"cursor p95":>12}'
+        )
+        for number in [page for page in PAGES if page <= last_page]:
+            offset = summary(timings(
+                lambda: list(Paginator(
+                    post_list, NUMBER_OF_POST_ON_PAGES
+                ).get_page(number)),
+                repeat
+            ))
+            cursor = self.cursor_for(post_list, number)
+            keyset = summary(timings(
+                lambda: list(CursorPaginator(
+                    post_list, NUMBER_OF_POST_ON_PAGES
+                ).get_page(cursor)),
+                repeat
+            ))
+            self.stdout.write(
+                f'{number:>8} {offset[0]:>10.2f}ms {offset[1]:>10.2f}ms '
+                f'{keyset[0]:>10.2f}ms {keyset[1]:>10.2f}ms'
+            )
+
+    def cursor_for(self, post_list, number):
+        if number == 1:
+            return None
+        boundary = post_list.order_by(*POST_ORDERING)[
+            (number - 1) * NUMBER_OF_POST_ON_PAGES - 1
+        ]
+        return encode_cursor(CURSOR_NEXT, boundary.pub_date, boundary.pk)
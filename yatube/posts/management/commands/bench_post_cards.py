@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks import benchmark_database, summary, timings
+from posts.models import Group, Post
+from posts.views import NUMBER_OF_POST_ON_PAGES
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Время рендера страницы из 10 постов с кешем карточек и без'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            url = self.fill()
+            client = Client()
+
+            def cold_render():
+                cache.clear()
+                client.get(url)
+
+            cold = summary(timings(cold_render, options['repeat']))
+            client.get(url)
+            warm = summary(timings(lambda: client.get(url), options['repeat']))
+        self.stdout.write(
+            f'холодные карточки: p50 {cold[0]:.2f}ms, p95 {cold[1]:.2f}ms\n'
+            f'карточки из кеша:  p50 {warm[0]:.2f}ms, p95 {warm[1]:.2f}ms'
+        )
+
+    def fill(self):
+        group = Group.objects.create(
+            title='Группа', slug='bench', description='Группа'
+        )
+        for number in range(NUMBER_OF_POST_ON_PAGES):
+            author = User.objects.create_user(
+                username=f'bench{number}',
+                first_name='Лев',
+                last_name='Толстой'
+            )
+            Post.objects.create(
+                text='Слово ' * 2000, author=author, group=group
+            )
+        return reverse('posts:group_list', kwargs={'slug': group.slug})
@@ -0,0 +1,94 @@
+import itertools
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import benchmark_database, summary, timings
+from posts.models import Post
+from posts.paginators import CursorPaginator
+from posts.search import RANK_ORDERING, rebuild_index, search_posts
+from posts.views import NUMBER_OF_POST_ON_PAGES
+
+User = get_user_model()
+BATCH_SIZE = 10000
+WORDS_PER_POST = 20
+ROOTS = (
+    'кот', 'собак', 'город', 'дорог', 'книг', 'музык', 'погод', 'работ',
+    'поезд', 'горн', 'река', 'лес', 'мост', 'окн', 'сад', 'звезд',
+)
+ENDINGS = ('', 'а', 'ы', 'ом', 'ами', 'ах', 'у', 'е')
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает LIKE и полнотекстовый индекс на N синтетических постах'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rng = random.Random(1)
+        vocabulary = [root + ending for root in ROOTS for ending in ENDINGS]
+        vocabulary += [f'слово{number}' for number in range(5000)]
+        # Частоты слов по закону Ципфа, как в живом тексте.
+        weights = list(itertools.accumulate(
+            1 / rank for rank in range(1, len(vocabulary) + 1)
+        ))
+        with benchmark_database():
+            started = time.perf_counter()
+            self.fill(options['posts'], rng, vocabulary, weights)
+            self.stdout.write(
+                f'Посты: {time.perf_counter() - started:.0f}s'
+            )
+            started = time.perf_counter()
+            rebuild_index(Post.objects.all())
+            self.stdout.write(
+                f'Индекс: {time.perf_counter() - started:.0f}s'
+            )
+            self.report(options['repeat'])
+
+    def fill(self, total, rng, vocabulary, weights):
+        author = User.objects.create_user(username='bench')
+        for start in range(0, total, BATCH_SIZE):
+            Post.objects.bulk_create(
+                Post(
+                    text=' '.join(rng.choices(
+                        vocabulary, cum_weights=weights, k=WORDS_PER_POST
+                    )),
+                    author=author
+                )
+                for _ in range(start, min(start + BATCH_SIZE, total))
+            )
+
+    def report(self, repeat):
+        self.stdout.write(
+            f'{"query":>16} {"like p50":>12} {"like p95":>12} '
+            f'{"fts p50":>12} {"fts p95":>12}'
+        )
+        for query, like_term in (
+            ('котами', 'кот'),
+            ('слово3000', 'слово3000'),
+            ('книги дороги', 'книг'),
+            ('жирафами', 'жираф'),
+        ):
+            like = summary(timings(
+                lambda: list(Post.objects.filter(
+                    text__icontains=like_term
+                )[:NUMBER_OF_POST_ON_PAGES]),
+                repeat
+            ))
+            fts = summary(timings(
+                lambda: list(CursorPaginator(
+                    search_posts(Post.objects.all(), query),
+                    NUMBER_OF_POST_ON_PAGES,
+                    RANK_ORDERING,
+                    parse=float
+                ).get_page()),
+                repeat
+            ))
+            self.stdout.write(
+                f'{query:>16} {like[0]:>10.1f}ms {like[1]:>10.1f}ms '
+                f'{fts[0]:>10.1f}ms {fts[1]:>10.1f}ms'
+            )
@@ -0,0 +1,172 @@
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import benchmark_database, percentile
+from posts.management.commands.loadtest import Targets
+from posts.seed import seed
+
+PORT = 8765
+STARTUP_TIMEOUT = 30
+REQUEST_TIMEOUT = 30
+SERVERS = {
+    'uvicorn (ASGI, async views)': lambda workers, port: [
+        '-m', 'uvicorn', 'yatube.asgi:application',
+        '--port', str(port), '--workers', str(workers),
+        '--log-level', 'warning', '--no-access-log',
+    ],
+    'gunicorn (WSGI, sync workers)': lambda workers, port: [
+        '-m', 'gunicorn', 'yatube.wsgi:application',
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+        '--log-level', 'warning',
+    ],
+}
+
+
+async def read_response(reader):
+    '''Статус ответа HTTP/1.1 и признак keep-alive; тело вычитывается.'''
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = dict(
+        line.lower().split(': ', 1) for line in lines[1:] if ': ' in line
+    )
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while size := int((await reader.readline()).strip(), 16):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    else:
+        await reader.read()
+        return status, False
+    return status, headers.get('connection') != 'close'
+
+
+async def connection(port, views, rng, deadline, latencies, errors):
+    '''Один клиент: запросы подряд, при keep-alive — в том же соединении.'''
+    stream = None
+    while time.perf_counter() < deadline:
+        name = rng.choice(list(views))
+        path, *cookie = views[name](rng)
+        request = f'GET {path} HTTP/1.1\r\nHost: localhost\r\n'
+        if cookie:
+            request += (
+                f'Cookie: {settings.SESSION_COOKIE_NAME}={cookie[0]}\r\n'
+            )
+        started = time.perf_counter()
+        try:
+            if stream is None:
+                stream = await asyncio.open_connection('127.0.0.1', port)
+            reader, writer = stream
+            writer.write((request + '\r\n').encode())
+            status, keep_alive = await asyncio.wait_for(
+                read_response(reader), REQUEST_TIMEOUT
+            )
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            errors[name] += 1
+            stream = None
+            continue
+        latencies[name].append((time.perf_counter() - started) * 1000)
+        errors[name] += status >= 500
+        if not keep_alive:
+            stream[1].close()
+            stream = None
+    if stream is not None:
+        stream[1].close()
+
+
+async def load(port, views, connections, seconds):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(
+        connection(
+            port, views, random.Random(number), deadline, latencies, errors
+        )
+        for number in range(connections)
+    ))
+    return latencies, errors
+
+
+def wait_for_port(port, process):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError('Сервер завершился при запуске')
+        try:
+            socket.create_connection(('127.0.0.1', port), 1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError('Сервер не запустился')
+
+
+class Command(BaseCommand):
+    help = (
+        'uvicorn с async-страницами против gunicorn с sync-воркерами '
+        'при N одновременных соединениях'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=500)
+        parser.add_argument('--seconds', type=float, default=20)
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--posts', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            database = os.path.join(directory, 'bench.sqlite3')
+            with benchmark_database(database):
+                seed(
+                    random.Random(1), users=500, groups=10,
+                    posts=options['posts'], comments=options['posts'] * 2,
+                    follows=20, prefix='bench'
+                )
+                targets = Targets()
+                env = {
+                    **os.environ,
+                    'DATABASE_URL': f'sqlite:///{database}',
+                    'CACHE_URL': f'file://{directory}/cache',
+                }
+                for name, command in SERVERS.items():
+                    self.report(name, command, env, targets, options)
+
+    def report(self, name, command, env, targets, options):
+        process = subprocess.Popen(
+            [sys.executable, *command(options['workers'], PORT)],
+            cwd=settings.BASE_DIR, env=env
+        )
+        try:
+            wait_for_port(PORT, process)
+            latencies, errors = asyncio.run(load(
+                PORT, targets.views(), options['connections'],
+                options['seconds']
+            ))
+        finally:
+            process.terminate()
+            process.wait()
+        total = sum(len(values) for values in latencies.values())
+        everything = [value for values in latencies.values()
+                      for value in values]
+        self.stdout.write(
+            f'{name}: {total / options["seconds"]:.0f} req/s, '
+            f'p50 {percentile(everything, 50):.0f}ms, '
+            f'p99 {percentile(everything, 99):.0f}ms, '
+            f'ошибок: {sum(errors.values())}'
+        )
+        for view, values in sorted(latencies.items()):
+            self.stdout.write(
+                f'  {view:<14} p50 {percentile(values, 50):>6.0f}ms  '
+                f'p99 {percentile(values, 99):>6.0f}ms  '
+                f'ошибок: {errors[view]}'
+            )
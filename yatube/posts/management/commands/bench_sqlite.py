@@ -0,0 +1,114 @@
+import logging
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmarks import benchmark_database, percentile
+from posts.models import Comment, Post
+
+User = get_user_model()
+POSTS = 200
+ROLLBACK_JOURNAL = {'journal_mode': 'delete'}
+
+
+def worker(role, post_ids, seconds, pragmas, max_age, seed):
+    '''Читатель открывает посты, писатель комментирует их.'''
+    connections.close_all()
+    connections['default'].settings_dict['CONN_MAX_AGE'] = max_age
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    rng = random.Random(seed)
+    client = Client(raise_request_exception=False)
+    if role == 'writer':
+        client.force_login(User.objects.get(username='writer'))
+    latencies = []
+    errors = 0
+    with override_settings(SQLITE_PRAGMAS=pragmas):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            post_id = rng.choice(post_ids)
+            started = time.perf_counter()
+            if role == 'writer':
+                response = client.post(
+                    reverse('posts:add_comment', args=[post_id]),
+                    {'text': 'Комментарий'}
+                )
+            else:
+                response = client.get(
+                    reverse('posts:post_detail', args=[post_id])
+                )
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += response.status_code >= 500
+    connections.close_all()
+    return role, latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Чтение и комментирование параллельными процессами: '
+        'журнал по умолчанию против WAL с прагмами'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            database = os.path.join(directory, 'bench.sqlite3')
+            with benchmark_database(database), override_settings(
+                CACHES={'default': {
+                    'BACKEND':
+                        'django.core.cache.backends.locmem.LocMemCache'
+                }}
+            ):
+                post_ids = self.fill()
+                profiles = {
+                    'Журнал отката, соединение на запрос':
+                        (ROLLBACK_JOURNAL, 0),
+                    'WAL и SQLITE_PRAGMAS, CONN_MAX_AGE=60':
+                        (settings.SQLITE_PRAGMAS, 60),
+                }
+                for name, (pragmas, max_age) in profiles.items():
+                    self.report(name, post_ids, pragmas, max_age, options)
+
+    def fill(self):
+        author = User.objects.create_user(username='author')
+        User.objects.create_user(username='writer')
+        return [
+            Post.objects.create(text=f'Пост {number}', author=author).pk
+            for number in range(POSTS)
+        ]
+
+    def report(self, name, post_ids, pragmas, max_age, options):
+        Comment.objects.all().delete()
+        connections.close_all()
+        roles = (
+            ['reader'] * options['readers'] + ['writer'] * options['writers']
+        )
+        context = multiprocessing.get_context('fork')
+        with context.Pool(len(roles)) as pool:
+            results = pool.starmap(worker, [
+                (role, post_ids, options['seconds'], pragmas, max_age, seed)
+                for seed, role in enumerate(roles)
+            ])
+        self.stdout.write(name)
+        for role in ('reader', 'writer'):
+            latencies = [
+                value for result in results if result[0] == role
+                for value in result[1]
+            ]
+            errors = sum(result[2] for result in results if result[0] == role)
+            self.stdout.write(
+                f'  {role}: {len(latencies) / options["seconds"]:.0f} req/s, '
+                f'p95: {percentile(latencies, 95):.1f}ms, ошибок: {errors}'
+            )
@@ -0,0 +1,175 @@
+import io
+import multiprocessing
+import random
+import time
+from collections import defaultdict
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks import percentile
+from posts.models import Group, Post, Profile
+
+SAMPLE = 500
+SESSIONS = 50
+ERROR_STATUS = 500
+
+
+def host():
+    '''Первый конкретный хост из ALLOWED_HOSTS.'''
+    for name in settings.ALLOWED_HOSTS:
+        if name != '*' and not name.startswith('.'):
+            return name
+    return 'localhost'
+
+
+def wsgi_get(app, path, cookie=None):
+    '''GET через WSGI-приложение, как его вызывает gunicorn; вернёт статус.'''
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'HTTP_HOST': host(),
+        'wsgi.input': io.BytesIO(),
+    }
+    if cookie:
+        environ['HTTP_COOKIE'] = f'{settings.SESSION_COOKIE_NAME}={cookie}'
+    setup_testing_defaults(environ)
+    status = []
+    response = app(environ, lambda code, headers: status.append(code))
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()
+    return int(status[0].split()[0])
+
+
+class Targets:
+    '''Случайные URL пяти основных страниц из данных в БД.'''
+
+    def __init__(self):
+        posts = list(Post.objects.order_by('?').values_list(
+            'pk', 'author__username', 'group__slug'
+        )[:SAMPLE])
+        if not posts:
+            raise CommandError('В БД нет постов, запустите manage.py seed')
+        self.post_ids = [pk for pk, _, _ in posts]
+        self.usernames = [username for _, username, _ in posts]
+        self.slugs = list(
+            Group.objects.values_list('slug', flat=True)[:SAMPLE]
+        ) or [slug for _, _, slug in posts if slug]
+        self.sessions = []
+        readers = Profile.objects.filter(
+            following_count__gt=0
+        ).select_related('user').order_by('?')[:SESSIONS]
+        for profile in readers:
+            client = Client()
+            client.force_login(profile.user)
+            self.sessions.append(
+                client.cookies[settings.SESSION_COOKIE_NAME].value
+            )
+
+    def views(self):
+        views = {
+            'index': lambda rng: (self.page(rng, reverse('posts:index')),),
+            'group_list': lambda rng: (self.page(rng, reverse(
+                'posts:group_list', args=[rng.choice(self.slugs)]
+            )),),
+            'profile': lambda rng: (self.page(rng, reverse(
+                'posts:profile', args=[rng.choice(self.usernames)]
+            )),),
+            'post_detail': lambda rng: (reverse(
+                'posts:post_detail', args=[rng.choice(self.post_ids)]
+            ),),
+        }
+        if self.sessions:
+            views['follow_index'] = lambda rng: (
+                self.page(rng, reverse('posts:follow_index')),
+                rng.choice(self.sessions)
+            )
+        return views
+
+    @staticmethod
+    def page(rng, url):
+        '''Чаще первая страница, иногда одна из следующих.'''
+        page = 1 if rng.random() < 0.8 else rng.randint(2, 10)
+        return f'{url}?page={page}'
+
+
+def worker(targets, requests, seed):
+    connections.close_all()
+    app = get_wsgi_application()
+    rng = random.Random(seed)
+    views = targets.views()
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    for _ in range(requests):
+        name = rng.choice(list(views))
+        request = views[name](rng)
+        started = time.perf_counter()
+        status = wsgi_get(app, *request)
+        latencies[name].append((time.perf_counter() - started) * 1000)
+        errors[name] += status >= ERROR_STATUS
+    return dict(latencies), dict(errors)
+
+
+class Command(BaseCommand):
+    help = 'Нагрузочный тест основных страниц через WSGI в процессе'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=1000,
+            help='Запросов на процесс'
+        )
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        targets = Targets()
+        jobs = [
+            (targets, options['requests'], options['seed'] + number)
+            for number in range(options['workers'])
+        ]
+        started = time.perf_counter()
+        if options['workers'] == 1:
+            results = [worker(*jobs[0])]
+        else:
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with context.Pool(options['workers']) as pool:
+                results = pool.starmap(worker, jobs)
+        elapsed = time.perf_counter() - started
+        self.report(results, elapsed)
+
+    def report(self, results, elapsed):
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        for views, view_errors in results:
+            for name, values in views.items():
+                latencies[name] += values
+                errors[name] += view_errors.get(name, 0)
+        total = sum(len(values) for values in latencies.values())
+        self.stdout.write(
+            f'{"view":<14} {"req":>6} {"p50":>9} {"p95":>9} {"p99":>9} '
+            f'{"5xx":>5}'
+        )
+        for name, values in sorted(latencies.items()):
+            self.stdout.write(
+                f'{name:<14} {len(values):>6} '
+                + ' '.join(
+                    f'{percentile(values, percent):>7.1f}ms'
+                    for percent in (50, 95, 99)
+                )
+                + f' {errors[name]:>5}'
+            )
+        self.stdout.write(
+            f'Всего: {total} запросов за {elapsed:.1f}s, '
+            f'{total / elapsed:.0f} req/s'
+        )
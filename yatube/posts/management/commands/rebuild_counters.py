@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов, подписок и комментариев'
+
+    def handle(self, *args, **options):
+        created, profiles, posts = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано профилей: {created}, '
+            f'пересчитано профилей: {profiles}, постов: {posts}'
+        ))
@@ -0,0 +1,50 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.models import User
+from posts.seed import seed
+
+
+class Command(BaseCommand):
+    help = 'Заполняет БД пользователями, группами, постами и подписками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=200000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок пользователя'
+        )
+        parser.add_argument(
+            '--images', type=float, default=0.2,
+            help='Доля постов с картинкой'
+        )
+        parser.add_argument('--prefix', default='seed')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                f'Пользователи с префиксом {prefix} уже есть, '
+                f'задайте другой --prefix'
+            )
+        started = time.perf_counter()
+        created = seed(
+            random.Random(options['seed']),
+            users=options['users'],
+            groups=options['groups'],
+            posts=options['posts'],
+            comments=options['comments'],
+            follows=options['follows'],
+            images=options['images'],
+            prefix=prefix
+        )
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(f'{name}: {count}' for name, count in created.items())
+            + f' за {time.perf_counter() - started:.1f}s'
+        ))
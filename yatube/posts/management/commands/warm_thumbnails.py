@@ -0,0 +1,51 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from posts import thumbnails
+from posts.models import Post
+
+BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = 'Строит миниатюры постов, для которых они ещё не готовы'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перестроить миниатюры всех постов с картинками'
+        )
+
+    def handle(self, *args, **options):
+        if not thumbnails.enabled():
+            raise CommandError('sorl.thumbnail не подключён')
+        posts = Post.objects.exclude(image='').only(
+            'id', 'image', 'thumbnails'
+        )
+        with transaction.atomic():
+            if options['force']:
+                post_ids = [
+                    post.pk for post in posts.iterator(chunk_size=BATCH_SIZE)
+                ]
+                posts.update(thumbnails={})
+            else:
+                post_ids = [
+                    post.pk for post in posts.iterator(chunk_size=BATCH_SIZE)
+                    if thumbnails.needs_thumbnails(post)
+                ]
+        # Дочерние процессы не должны наследовать открытое соединение.
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=options['workers'], initializer=connections.close_all
+        ) as pool:
+            list(pool.map(thumbnails.run, post_ids, chunksize=16))
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано постов: {len(post_ids)}'
+        ))
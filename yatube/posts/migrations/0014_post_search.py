@@ -0,0 +1,90 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:49
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+import posts.models
+
+FTS_TABLE = 'posts_post_fts'
+SEARCH_INDEX = 'post_text_search_idx'
+WORD_RE = re.compile(r'\w+')
+BATCH_SIZE = 5000
+
+
+def stemmed_body(stemmer, text):
+    words = WORD_RE.findall(text.lower().replace('ё', 'е'))
+    return ' '.join(stemmer.stemWord(word) for word in words)
+
+
+def fill_fts(apps):
+    import snowballstemmer
+    stemmer = snowballstemmer.stemmer('russian')
+    Post = apps.get_model('posts', 'Post')
+    PostSearchEntry = apps.get_model('posts', 'PostSearchEntry')
+    rows = Post.objects.values_list('pk', 'text').iterator(
+        chunk_size=BATCH_SIZE
+    )
+    entries = []
+    for pk, text in rows:
+        entries.append(
+            PostSearchEntry(post_id=pk, body=stemmed_body(stemmer, text))
+        )
+        if len(entries) == BATCH_SIZE:
+            PostSearchEntry.objects.bulk_create(entries)
+            entries = []
+    PostSearchEntry.objects.bulk_create(entries)
+
+
+def search_index(Post):
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+    return GinIndex(
+        SearchVector('text', config='russian'), name=SEARCH_INDEX
+    )
+
+
+def create_search_index(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.add_index(Post, search_index(Post))
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+            f"body, tokenize='unicode61 remove_diacritics 2')"
+        )
+        fill_fts(apps)
+
+
+def drop_search_index(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.remove_index(Post, search_index(Post))
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_post_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchEntry',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='posts.post', verbose_name='Пост')),
+                ('body', posts.models.FullTextField(verbose_name='Основы слов')),
+            ],
+            options={
+                'verbose_name': 'Поисковый индекс поста',
+                'verbose_name_plural': 'Поисковый индекс постов',
+                'db_table': 'posts_post_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,10 +1,40 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+
+from posts import excerpts
 
 User = get_user_model()
 TEXT_LIMIT_FOR_STR = 15
 
 
+class CountedModel(models.Model):
+    '''Запись и обработчики post_save выполняются в одной транзакции.
+
+    Поля counter_fields меняются только атомарными UPDATE из сигналов,
+    поэтому при сохранении существующего объекта они не перезаписываются
+    устаревшим значением из памяти.
+    '''
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            self.counter_fields
+            and not self._state.adding
+            and kwargs.get('update_fields') is None
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200, verbose_name='Название')
     slug = models.SlugField(unique=True)
@@ -18,12 +48,45 @@ class Group(models.Model):
         verbose_name_plural = 'Группы'
 
 
-class Post(models.Model):
+class PostQuerySet(models.QuerySet):
+    list_related = ('author', 'group')
+    # Колонки карточки поста: полный текст в лентах не нужен, вместо
+    # него выводится анонс.
+    list_fields = (
+        'pub_date', 'image', 'thumbnails', 'excerpt',
+        'author__username', 'author__first_name', 'author__last_name',
+        'group__title', 'group__slug',
+    )
+
+    def for_list(self):
+        '''Посты для лент: автор и группа в том же запросе, без текста.'''
+        return self.select_related(*self.list_related).only(
+            *self.list_related, *self.list_fields
+        )
+
+    def for_detail(self):
+        '''Пост для страницы поста вместе со счётчиками автора.'''
+        return self.select_related('author__profile', 'group')
+
+
+class CommentQuerySet(models.QuerySet):
+    def for_list(self):
+        '''Комментарии вместе с авторами.'''
+        return self.select_related('author')
+
+
+class Post(CountedModel):
+    counter_fields = ('comments_count',)
+
     text = models.TextField(verbose_name='Текст поста')
     pub_date = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата публикации'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -43,17 +106,105 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    thumbnails = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Миниатюры'
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    excerpt = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Анонс'
+    )
+    word_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество слов'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self) -> str:
         return self.text[:TEXT_LIMIT_FOR_STR]
 
+    def save(self, *args, **kwargs):
+        '''Анонс пересчитывается вместе с текстом.'''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            for field, value in excerpts.summarize(self.text).items():
+                setattr(self, field, value)
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, 'excerpt', 'word_count'
+                }
+        super().save(*args, **kwargs)
+
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'
+            ),
+        ]
+
+
+class FullTextField(models.TextField):
+    '''Колонка виртуальной таблицы FTS5 с поиском через __match.'''
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
 
 
-class Comment(models.Model):
+class PostSearchEntry(models.Model):
+    '''Строка полнотекстового индекса постов в SQLite (FTS5).
+
+    Таблицу создаёт миграция: в body лежат основы слов текста поста,
+    rowid совпадает с id поста. В Postgres вместо неё GIN-индекс.
+    '''
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_entry',
+        verbose_name='Пост'
+    )
+    body = FullTextField(verbose_name='Основы слов')
+
+    class Meta:
+        managed = False
+        db_table = 'posts_post_fts'
+        verbose_name = 'Поисковый индекс поста'
+        verbose_name_plural = 'Поисковый индекс постов'
+
+
+class Comment(CountedModel):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -73,16 +224,33 @@ class Comment(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации комментария'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения комментария'
+    )
+
+    objects = CommentQuerySet.as_manager()
 
     def __str__(self) -> str:
         return self.text[TEXT_LIMIT_FOR_STR]
 
     class Meta:
+        ordering = ['created', 'id']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['post', 'created', 'id'],
+                name='comment_post_created_idx'
+            ),
+            models.Index(
+                fields=['created', 'id'],
+                name='comment_created_idx'
+            ),
+        ]
 
 
-class Follow(models.Model):
+class Follow(CountedModel):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -108,3 +276,84 @@ class Follow(models.Model):
                 name='author_user_unique'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['user', 'author'],
+                name='follow_user_author_idx'
+            ),
+        ]
+
+
+class Profile(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='profile',
+        verbose_name='Пользователь'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписчиков'
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписок'
+    )
+
+    def __str__(self) -> str:
+        return str(self.user)
+
+    class Meta:
+        verbose_name = 'Профиль'
+        verbose_name_plural = 'Профили'
+
+
+class FeedItem(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_items',
+        db_index=False,
+        verbose_name='Подписчик'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_items',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    def __str__(self) -> str:
+        return f'{self.user_id} ← {self.post_id}'
+
+    class Meta:
+        ordering = ['-pub_date', '-post_id']
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='feed_user_post_unique'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='feed_user_pub_date_idx'
+            ),
+            models.Index(
+                fields=['user', 'author', '-pub_date'],
+                name='feed_user_author_idx'
+            ),
+        ]
@@ -0,0 +1,293 @@
+import asyncio
+import hashlib
+import itertools
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core import background
+from core.metrics import registry
+from core.routers import primary
+from posts.feeds import BATCH_SIZE, is_fanout_author
+from posts.models import Follow
+
+SITE = 'site'
+INDEX = 'index'
+PULL_FEEDS = 'pull'
+COMMENTS = 'comments'
+LOCK_TIMEOUT = 10
+LOCK_POLL_INTERVAL = 0.05
+
+# Страницы, которые сейчас собирают async-запросы этого процесса.
+_building = {}
+
+
+def generation_key(scope):
+    return f'feed_gen:{hashlib.md5(scope.encode()).hexdigest()}'
+
+
+def group_scope(slug):
+    return f'group:{slug}'
+
+
+def profile_scope(username):
+    return f'profile:{username}'
+
+
+def feed_scope(user_id):
+    return f'feed:{user_id}'
+
+
+def index_scopes(request):
+    return (INDEX,)
+
+
+def group_scopes(request, slug):
+    return (group_scope(slug),)
+
+
+def profile_scopes(request, username):
+    return (profile_scope(username),)
+
+
+def follow_scopes(request):
+    return (feed_scope(request.user.pk), PULL_FEEDS)
+
+
+def _set_generations(scopes):
+    now = time.time_ns()
+    cache.set_many({generation_key(scope): now for scope in scopes}, None)
+
+
+def bump(*scopes):
+    '''Делает устаревшими все закешированные страницы перечисленных лент.
+
+    Поколение меняется сразу и ещё раз после коммита, чтобы страница,
+    собранная параллельным запросом до коммита, не прижилась в кеше.
+    '''
+    _set_generations(scopes)
+    transaction.on_commit(lambda: _set_generations(scopes))
+    for scope in scopes:
+        registry.count(
+            'yatube_page_cache_evictions_total', scope.split(':')[0]
+        )
+
+
+def generation_values(scopes):
+    '''Поколения лент: время последнего изменения каждой в наносекундах.'''
+    keys = [generation_key(scope) for scope in scopes]
+    values = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in values}
+    if missing:
+        cache.set_many(missing, None)
+        values.update(missing)
+    return [values[key] for key in keys]
+
+
+def generations(scopes):
+    return '.'.join(str(value) for value in generation_values(scopes))
+
+
+def page_key(request, scopes):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return (
+        f'feed_page:{generations(scopes)}:'
+        f'{request.user.pk or 0}:{path}'
+    )
+
+
+def invalidate_post(post, previous_group_slug=None):
+    '''Сбрасывает ленты, в которых показывается пост.
+
+    Ленты подписчиков сбрасываются после коммита в фоне: у автора их
+    может быть до FEED_FANOUT_LIMIT, и создание поста не ждёт записи
+    стольких ключей. Страница, собранная до коммита, нового поста ещё
+    не содержит и сбрасывается этим же проходом.
+    '''
+    scopes = [INDEX, profile_scope(post.author.username)]
+    slugs = {previous_group_slug, post.group.slug if post.group else None}
+    scopes += [group_scope(slug) for slug in slugs if slug]
+    if is_fanout_author(post.author_id):
+        background.on_commit(bump_follower_feeds, post.author_id)
+    else:
+        scopes.append(PULL_FEEDS)
+    bump(*scopes)
+
+
+def bump_follower_feeds(author_id):
+    '''Сбрасывает ленты подписчиков автора, по BATCH_SIZE ключей за раз.'''
+    follower_ids = Follow.objects.filter(
+        author_id=author_id
+    ).values_list('user_id', flat=True)
+    with transaction.atomic(savepoint=False):
+        follower_ids = follower_ids.iterator(chunk_size=BATCH_SIZE)
+        while batch := list(itertools.islice(follower_ids, BATCH_SIZE)):
+            _set_generations(feed_scope(pk) for pk in batch)
+            registry.count(
+                'yatube_page_cache_evictions_total', 'feed', len(batch)
+            )
+
+
+def invalidate_group(group, previous=None, deleted=False):
+    '''Сбрасывает страницы, на которых видна группа.
+
+    Описание выводится только на странице группы. Название и адрес есть
+    в карточках постов группы во всех лентах, поэтому их изменение и
+    удаление группы сбрасывают все ленты.
+    '''
+    if deleted or (previous and previous != (group.title, group.slug)):
+        bump(SITE)
+    else:
+        bump(group_scope(group.slug))
+
+
+def invalidate_author():
+    '''Имя автора есть в карточках его постов во всех лентах, поэтому
+    переименование и удаление пользователя сбрасывают все ленты.'''
+    bump(SITE)
+
+
+def invalidate_comment(comment):
+    '''Ленты на сайте комментарии не показывают; поколение COMMENTS
+    нужно спискам постов API, где есть число комментариев.'''
+    bump(COMMENTS)
+
+
+def invalidate_follow(follow):
+    '''Сбрасывает профили обеих сторон подписки и ленту подписчика.'''
+    invalidate_follows(follow.user, [follow.author.username])
+
+
+def invalidate_follows(user, usernames):
+    '''invalidate_follow для подписок пользователя на многих авторов.'''
+    bump(
+        profile_scope(user.username),
+        feed_scope(user.pk),
+        *(profile_scope(username) for username in usernames)
+    )
+
+
+def wait_for(key):
+    '''Ждёт, пока страницу соберёт запрос, захвативший блокировку.'''
+    deadline = time.monotonic() + settings.FEED_PAGE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        response = cache.get(key)
+        if response is not None:
+            return response
+    return None
+
+
+async def await_for(key):
+    '''Асинхронный wait_for: не занимает поток, пока ждёт.'''
+    deadline = time.monotonic() + settings.FEED_PAGE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        response = await cache.aget(key)
+        if response is not None:
+            return response
+    return None
+
+
+def async_cached_feed(view, scopes_for):
+    '''cached_feed для async-view.
+
+    Запросы одного процесса к одной странице ждут сборщика на
+    asyncio.Event, а не опрашивают кеш: опрос идёт через поток
+    sync_to_async, и сотни ждущих отнимали бы его у сборщика.
+    '''
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return await view(request, *args, **kwargs)
+        key = await sync_to_async(lambda: page_key(
+            request, (SITE, *scopes_for(request, *args, **kwargs))
+        ))()
+        response = await cache.aget(key)
+        if response is not None:
+            registry.count('yatube_page_cache_hits_total', view.__name__)
+            return response
+        registry.count('yatube_page_cache_misses_total', view.__name__)
+        building = _building.get(key)
+        if building is not None:
+            await building.wait()
+            response = await cache.aget(key)
+            if response is not None:
+                return response
+            with primary():
+                return await view(request, *args, **kwargs)
+        _building[key] = building = asyncio.Event()
+        try:
+            return await build_page(key, view, request, *args, **kwargs)
+        finally:
+            del _building[key]
+            building.set()
+    return wrapper
+
+
+async def build_page(key, view, request, *args, **kwargs):
+    lock = f'{key}:lock'
+    locked = await cache.aadd(lock, 1, LOCK_TIMEOUT)
+    if not locked:
+        response = await await_for(key)
+        if response is not None:
+            return response
+    try:
+        with primary():
+            response = await view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.cookies:
+            await cache.aset(key, response, settings.FEED_PAGE_CACHE_TIMEOUT)
+    finally:
+        if locked:
+            await cache.adelete(lock)
+    return response
+
+
+def cached_feed(scopes_for):
+    '''Кеширует GET-страницу ленты по поколениям её scopes.
+
+    Ключ страницы содержит текущие поколения лент, пользователя и URL,
+    поэтому TTL может быть длинным: после изменения данных поколение
+    меняется, и старая страница больше никогда не запрашивается.
+    При промахе страницу собирает один запрос, остальные ждут его.
+    Собирается она по основной БД: отстающая реплика могла бы сохранить
+    старую страницу под уже новым поколением.
+    '''
+    def decorator(view):
+        if iscoroutinefunction(view):
+            return async_cached_feed(view, scopes_for)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+            scopes = (SITE, *scopes_for(request, *args, **kwargs))
+            key = page_key(request, scopes)
+            response = cache.get(key)
+            if response is not None:
+                registry.count('yatube_page_cache_hits_total', view.__name__)
+                return response
+            registry.count('yatube_page_cache_misses_total', view.__name__)
+            lock = f'{key}:lock'
+            locked = cache.add(lock, 1, LOCK_TIMEOUT)
+            if not locked:
+                response = wait_for(key)
+                if response is not None:
+                    return response
+            try:
+                with primary():
+                    response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.cookies:
+                    cache.set(
+                        key, response, settings.FEED_PAGE_CACHE_TIMEOUT
+                    )
+            finally:
+                if locked:
+                    cache.delete(lock)
+            return response
+        return wrapper
+    return decorator
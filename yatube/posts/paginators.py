@@ -0,0 +1,217 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
+
+CURSOR_NEXT = 'n'
+CURSOR_PREVIOUS = 'p'
+POST_ORDERING = ('-pub_date', '-id')
+COMMENT_ORDERING = ('created', 'id')
+EXACT_COUNT_LIMIT = 100000
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(direction, value, pk):
+    '''Упаковывает позицию (дата или ранг, id) в непрозрачный токен.'''
+    value = value.isoformat() if hasattr(value, 'isoformat') else repr(value)
+    raw = f'{direction}|{value}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, parse=datetime.fromisoformat):
+    '''Распаковывает токен в (direction, значение, id).'''
+    try:
+        padding = '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(token + padding).decode()
+        direction, value, pk = raw.split('|')
+        if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS):
+            raise ValueError(direction)
+        return direction, parse(value), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise InvalidCursor(token) from error
+
+
+class CursorPage(Sequence):
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = None
+        self.previous_cursor = None
+        if has_next:
+            self.next_cursor = encode_cursor(
+                CURSOR_NEXT, *paginator.position(object_list[-1])
+            )
+        if has_previous:
+            self.previous_cursor = encode_cursor(
+                CURSOR_PREVIOUS, *paginator.position(object_list[0])
+            )
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    '''Keyset-пагинация по (дата, id) без COUNT(*) и OFFSET.
+
+    Каждая страница выбирается одним запросом с условием поиска
+    относительно границы предыдущей страницы, поэтому стоимость запроса
+    не зависит от глубины страницы. Избыточное условие pub_date <= X
+    даёт СУБД диапазон для поиска по индексу (pub_date, id).
+    Порядок задаётся парой полей ordering, оба по убыванию или оба по
+    возрастанию; parse разбирает значение первого поля из курсора
+    (по умолчанию — дату).
+    '''
+
+    def __init__(self, object_list, per_page, ordering=POST_ORDERING,
+                 parse=datetime.fromisoformat):
+        self.date_field, self.id_field = (
+            field.lstrip('-') for field in ordering
+        )
+        self.forward, self.backward = (
+            ('lt', 'gt') if ordering[0].startswith('-') else ('gt', 'lt')
+        )
+        self.reverse_ordering = [
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in ordering
+        ]
+        self.object_list = object_list.order_by(*ordering)
+        self.per_page = per_page
+        self.parse = parse
+
+    def position(self, obj):
+        return getattr(obj, self.date_field), getattr(obj, self.id_field)
+
+    def seek(self, lookup, pub_date, pk):
+        '''Условие «строго после (pub_date, pk)» в направлении lookup.'''
+        date, key = self.date_field, self.id_field
+        return self.object_list.filter(
+            Q(**{f'{date}__{lookup}': pub_date})
+            | Q(**{date: pub_date, f'{key}__{lookup}': pk}),
+            **{f'{date}__{lookup}e': pub_date}
+        )
+
+    def plan(self, cursor):
+        '''Запрос страницы и функция, собирающая из его строк CursorPage.'''
+        try:
+            direction, pub_date, pk = decode_cursor(cursor or '', self.parse)
+        except InvalidCursor:
+            return self.object_list[:self.per_page + 1], self._first_page
+        if direction == CURSOR_NEXT:
+            return (
+                self.seek(self.forward, pub_date, pk)[:self.per_page + 1],
+                self._next_page
+            )
+        return (
+            self.seek(self.backward, pub_date, pk).order_by(
+                *self.reverse_ordering
+            )[:self.per_page + 1],
+            self._previous_page
+        )
+
+    def get_page(self, cursor=None):
+        '''Возвращает страницу после/до курсора, при ошибке — первую.'''
+        queryset, build = self.plan(cursor)
+        return build(list(queryset))
+
+    def _first_page(self, rows):
+        return CursorPage(
+            rows[:self.per_page],
+            self,
+            has_next=len(rows) > self.per_page,
+            has_previous=False
+        )
+
+    def _next_page(self, rows):
+        return CursorPage(
+            rows[:self.per_page],
+            self,
+            has_next=len(rows) > self.per_page,
+            has_previous=bool(rows)
+        )
+
+    def _previous_page(self, rows):
+        return CursorPage(
+            rows[:self.per_page][::-1],
+            self,
+            has_next=bool(rows),
+            has_previous=len(rows) > self.per_page
+        )
+
+
+def estimate_count(queryset):
+    '''Оценка числа строк queryset по статистике СУБД или None.
+
+    Без фильтров: reltuples в Postgres или sqlite_stat1 после ANALYZE,
+    а без статистики — MAX(id). С фильтрами оценку даёт только
+    планировщик Postgres.
+    '''
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if queryset.query.where:
+            if connection.vendor != 'postgresql':
+                return None
+            plan = queryset.explain(format='json')
+            return int(json.loads(plan)[0]['Plan']['Plan Rows'])
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE relname = %s', [table]
+            )
+            row = cursor.fetchone()
+            if row and row[0] >= 0:
+                return int(row[0])
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone():
+                cursor.execute(
+                    'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                    [table]
+                )
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+    return queryset.aggregate(last=Max('pk'))['last']
+
+
+class EstimatedCountPaginator(Paginator):
+    '''Paginator без точного COUNT(*) на больших выборках.
+
+    Строки считаются не дальше EXACT_COUNT_LIMIT: на маленьких выборках
+    число точное, на больших берётся оценка СУБД, а если её нет —
+    сам лимит.
+    '''
+
+    @cached_property
+    def count(self):
+        count = self.object_list.order_by()[:EXACT_COUNT_LIMIT].count()
+        if count < EXACT_COUNT_LIMIT:
+            return count
+        return max(estimate_count(self.object_list) or 0, count)
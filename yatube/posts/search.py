@@ -0,0 +1,147 @@
+import re
+import threading
+from functools import lru_cache
+
+import snowballstemmer
+from django.db import connection, transaction
+from django.db.models import Case, FloatField, Subquery, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from posts.models import Post, PostSearchEntry
+
+SEARCH_CONFIG = 'russian'
+RANK_ORDERING = ('-rank', '-id')
+QUERY_MAX_LENGTH = 200
+RANKED_MATCHES = 1000
+# Ниже любой релевантности: bm25 и ts_rank совпадений неотрицательны.
+UNRANKED = -1.0
+BATCH_SIZE = 5000
+WORD_RE = re.compile(r'\w+')
+
+_local = threading.local()
+
+
+def uses_fts():
+    '''В SQLite поиск идёт по таблице FTS5, в Postgres — по tsvector.'''
+    return connection.vendor == 'sqlite'
+
+
+@lru_cache(maxsize=100000)
+def stem(word):
+    # Стеммеры snowballstemmer хранят состояние, по одному на поток.
+    if not hasattr(_local, 'stemmer'):
+        _local.stemmer = snowballstemmer.stemmer(SEARCH_CONFIG)
+    return _local.stemmer.stemWord(word)
+
+
+def stems(text):
+    '''Основы слов текста: «Котами» и «кот» дают одну основу.'''
+    words = WORD_RE.findall(text.lower().replace('ё', 'е'))
+    return [stem(word) for word in words]
+
+
+def match_expression(query):
+    '''Запрос FTS5: все основы слов, каждая в кавычках как литерал.'''
+    return ' '.join(f'"{word}"' for word in stems(query)) or None
+
+
+def index_post(post):
+    if uses_fts():
+        PostSearchEntry(
+            post_id=post.pk, body=' '.join(stems(post.text))
+        ).save()
+
+
+def unindex_post(post_id):
+    if uses_fts():
+        PostSearchEntry.objects.filter(pk=post_id).delete()
+
+
+def rebuild_index(posts):
+    '''Перестраивает индекс FTS5 по posts, возвращает число записей.'''
+    if not uses_fts():
+        return 0
+    rows = posts.values_list('pk', 'text').iterator(chunk_size=BATCH_SIZE)
+    entries = []
+    count = 0
+    with transaction.atomic():
+        PostSearchEntry.objects.all().delete()
+        for pk, text in rows:
+            entries.append(
+                PostSearchEntry(post_id=pk, body=' '.join(stems(text)))
+            )
+            if len(entries) == BATCH_SIZE:
+                count += len(PostSearchEntry.objects.bulk_create(entries))
+                entries = []
+        count += len(PostSearchEntry.objects.bulk_create(entries))
+    return count
+
+
+def matching_posts(posts, query):
+    '''Все посты со словами запроса, без ранжирования.'''
+    query = query[:QUERY_MAX_LENGTH]
+    if not stems(query):
+        return posts.none()
+    if uses_fts():
+        return posts.filter(
+            search_entry__body__match=match_expression(query)
+        )
+    from django.contrib.postgres.search import SearchQuery, SearchVector
+    return posts.alias(
+        search=SearchVector('text', config=SEARCH_CONFIG)
+    ).filter(search=SearchQuery(query, config=SEARCH_CONFIG))
+
+
+def search_posts(posts, query):
+    '''Посты, найденные по запросу, с релевантностью в поле rank.
+
+    Чем больше rank, тем выше пост в выдаче; при равном rank — новее.
+    Релевантность считается только для RANKED_MATCHES самых новых
+    совпадений: для частых слов считать её у сотен тысяч постов слишком
+    дорого, а найти границу по id индекс позволяет быстро. Более старые
+    совпадения получают rank UNRANKED и идут после них по дате.
+    '''
+    query = query[:QUERY_MAX_LENGTH]
+    if not stems(query):
+        return posts.none().annotate(rank=Value(0.0))
+    if uses_fts():
+        table = PostSearchEntry._meta.db_table
+        expression = match_expression(query)
+        return posts.filter(search_entry__body__match=expression).annotate(
+            rank=ranked_newest(
+                RawSQL(
+                    f'COALESCE((SELECT rowid FROM "{table}" '
+                    f'WHERE "{table}" MATCH %s ORDER BY rowid DESC '
+                    f'LIMIT 1 OFFSET %s), 0)',
+                    [expression, RANKED_MATCHES - 1]
+                ),
+                RawSQL(f'-bm25("{table}")', [], output_field=FloatField())
+            )
+        )
+    from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                                SearchVector)
+    vector = SearchVector('text', config=SEARCH_CONFIG)
+    search_query = SearchQuery(query, config=SEARCH_CONFIG)
+    # alias, а не annotate: tsvector нужен только в WHERE, где его берёт
+    # GIN-индекс, и не должен считаться для каждой строки выдачи.
+    matches = Post.objects.alias(search=vector).filter(search=search_query)
+    return posts.alias(search=vector).filter(search=search_query).annotate(
+        rank=ranked_newest(
+            Coalesce(Subquery(
+                matches.order_by('-pk').values('pk')[
+                    RANKED_MATCHES - 1:RANKED_MATCHES
+                ]
+            ), 0),
+            SearchRank(vector, search_query)
+        )
+    )
+
+
+def ranked_newest(boundary, rank):
+    '''rank для постов не старше boundary, UNRANKED для остальных.'''
+    return Case(
+        When(pk__gte=boundary, then=rank),
+        default=Value(UNRANKED),
+        output_field=FloatField()
+    )
@@ -0,0 +1,166 @@
+import io
+import itertools
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from faker.providers.lorem.ru_RU import Provider as RussianLorem
+from PIL import Image
+
+from posts import feeds, page_cache, search
+from posts.excerpts import summarize
+from posts.counters import rebuild_counters
+from posts.models import Comment, Follow, Group, Post, User
+
+BATCH_SIZE = 5000
+IMAGES = 8
+IMAGE_SIZE = (960, 640)
+HISTORY = timedelta(days=365)
+POPULARITY = 1.1
+WORDS = RussianLorem.word_list
+
+
+def power_law(count, exponent=POPULARITY):
+    '''Накопленные веса Ципфа: k-й по популярности — с весом 1/k^a.'''
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+def batches(objects, size=BATCH_SIZE):
+    iterator = iter(objects)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def bulk_create(model, objects):
+    '''Пакетная вставка: каждая пачка в своей транзакции, вернёт id.'''
+    created = []
+    for batch in batches(objects):
+        with transaction.atomic():
+            created += [obj.pk for obj in model.objects.bulk_create(batch)]
+    return created
+
+
+@contextmanager
+def explicit_dates(model, field_name):
+    '''Даёт задать поле с auto_now_add при bulk_create.'''
+    field = model._meta.get_field(field_name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def make_images(prefix, rng):
+    '''Несколько общих картинок на все посты: файлы не множатся.'''
+    names = []
+    for number in range(IMAGES):
+        content = io.BytesIO()
+        color = tuple(rng.randrange(256) for _ in range(3))
+        Image.new('RGB', IMAGE_SIZE, color).save(content, 'JPEG')
+        names.append(default_storage.save(
+            f'posts/{prefix}_{number}.jpg', ContentFile(content.getvalue())
+        ))
+    return names
+
+
+def text(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words)).capitalize() + '.'
+
+
+def new_post(body, **fields):
+    '''Пост для bulk_create: save() не вызывается, анонс считается здесь.'''
+    return Post(text=body, **summarize(body), **fields)
+
+
+def seed(rng, users, groups, posts, comments, follows, images=0.0,
+         prefix='seed'):
+    '''Создаёт набор данных заданного размера через bulk_create.
+
+    Подписки и авторство распределены по степенному закону: немногие
+    авторы собирают большую часть подписчиков и постов, как в живой сети.
+    Сигналы при bulk_create не срабатывают, поэтому счётчики, ленты и
+    поисковый индекс перестраиваются в конце одним проходом.
+    '''
+    password = make_password(None)
+    author_ids = bulk_create(User, (
+        User(username=f'{prefix}{number}', password=password)
+        for number in range(users)
+    ))
+    weights = power_law(users)
+    group_ids = bulk_create(Group, (
+        Group(
+            title=text(rng, 2)[:200],
+            slug=f'{prefix}-group-{number}',
+            description=text(rng, 12)
+        )
+        for number in range(groups)
+    ))
+
+    edges = set()
+    for user_id in author_ids:
+        targets = rng.choices(
+            author_ids, cum_weights=weights,
+            k=min(users - 1, int(rng.paretovariate(2) * follows / 2))
+        )
+        edges.update(
+            (user_id, author_id) for author_id in targets
+            if author_id != user_id
+        )
+    bulk_create(Follow, (
+        Follow(user_id=user_id, author_id=author_id)
+        for user_id, author_id in edges
+    ))
+
+    # Активность авторов тоже степенная, но не совпадает с популярностью:
+    # иначе самые читаемые авторы писали бы почти все посты.
+    writers = rng.sample(author_ids, len(author_ids))
+    image_names = make_images(prefix, rng) if images else []
+    started = timezone.now() - HISTORY
+    step = HISTORY / max(posts, 1)
+    with explicit_dates(Post, 'pub_date'):
+        post_ids = bulk_create(Post, (
+            new_post(
+                text(rng, rng.randint(5, 60)),
+                author_id=rng.choices(writers, cum_weights=weights)[0],
+                group_id=(
+                    rng.choice(group_ids)
+                    if group_ids and rng.random() < 0.7 else None
+                ),
+                image=(
+                    rng.choice(image_names)
+                    if image_names and rng.random() < images else ''
+                ),
+                pub_date=started + step * number,
+            )
+            for number in range(posts)
+        ))
+    # Больше всего комментариев у самых новых постов.
+    newest_first = post_ids[::-1]
+    post_weights = power_law(len(post_ids))
+    bulk_create(Comment, (
+        Comment(
+            post_id=rng.choices(newest_first, cum_weights=post_weights)[0],
+            author_id=rng.choice(author_ids),
+            text=text(rng, rng.randint(3, 20))
+        )
+        for _ in range(comments if post_ids else 0)
+    ))
+    rebuild_counters()
+    feed_items = feeds.rebuild_feeds()
+    search.rebuild_index(Post.objects.all())
+    page_cache.bump(page_cache.SITE)
+    return {
+        'users': users,
+        'groups': groups,
+        'follows': len(edges),
+        'posts': posts,
+        'comments': comments if post_ids else 0,
+        'feed_items': feed_items,
+    }
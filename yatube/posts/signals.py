@@ -0,0 +1,165 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from posts import feeds, page_cache, search, thumbnails
+from posts.cards import bump_card_version
+from posts.models import Comment, Follow, Group, Post, Profile, User
+
+
+# Поля пользователя, которые видны в карточках постов и на страницах.
+AUTHOR_CARD_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def author_card(user):
+    return tuple(getattr(user, field) for field in AUTHOR_CARD_FIELDS)
+
+
+def change_counter(queryset, field, delta):
+    '''Атомарно сдвигает счётчик, не опуская его ниже нуля.'''
+    queryset.update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def change_profile_counter(user_id, field, delta):
+    change_counter(Profile.objects.filter(user_id=user_id), field, delta)
+
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Profile.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=User)
+def remember_author_card(sender, instance, raw=False, update_fields=None,
+                         **kwargs):
+    instance.previous_card = None
+    if instance._state.adding or raw:
+        return
+    if update_fields is not None and not (
+        set(update_fields) & set(AUTHOR_CARD_FIELDS)
+    ):
+        return
+    instance.previous_card = User.objects.filter(
+        pk=instance.pk
+    ).values_list(*AUTHOR_CARD_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, 'previous_card', None)
+    if previous is None or previous == author_card(instance):
+        return
+    bump_card_version('author', instance.pk)
+    page_cache.invalidate_author()
+
+
+@receiver(post_delete, sender=User)
+def author_deleted(sender, instance, **kwargs):
+    bump_card_version('author', instance.pk)
+    page_cache.invalidate_author()
+
+
+@receiver(pre_save, sender=Post)
+def remember_group(sender, instance, raw=False, **kwargs):
+    if not instance._state.adding and not raw:
+        instance.previous_group_slug = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group__slug', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    bump_card_version('post', instance.pk)
+    page_cache.invalidate_post(
+        instance, getattr(instance, 'previous_group_slug', None)
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_text_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or 'text' in update_fields:
+        search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted_from_search(sender, instance, **kwargs):
+    search.unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def post_image_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        thumbnails.schedule(instance)
+
+
+@receiver(pre_save, sender=Group)
+def remember_group_card(sender, instance, raw=False, **kwargs):
+    if not instance._state.adding and not raw:
+        instance.previous_card = Group.objects.filter(
+            pk=instance.pk
+        ).values_list('title', 'slug').first()
+
+
+@receiver(post_save, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    bump_card_version('group', instance.pk)
+    page_cache.invalidate_group(
+        instance, getattr(instance, 'previous_card', None)
+    )
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    bump_card_version('group', instance.pk)
+    page_cache.invalidate_group(instance, deleted=True)
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_profile_counter(instance.author_id, 'posts_count', 1)
+        feeds.push_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    change_profile_counter(instance.author_id, 'posts_count', -1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_counter(
+            Post.objects.filter(pk=instance.post_id), 'comments_count', 1
+        )
+        page_cache.invalidate_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    change_counter(
+        Post.objects.filter(pk=instance.post_id), 'comments_count', -1
+    )
+    page_cache.invalidate_comment(instance)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_profile_counter(instance.author_id, 'followers_count', 1)
+        change_profile_counter(instance.user_id, 'following_count', 1)
+        feeds.switch_modes([instance.author_id], 1)
+        feeds.backfill(instance)
+        page_cache.invalidate_follow(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    change_profile_counter(instance.author_id, 'followers_count', -1)
+    change_profile_counter(instance.user_id, 'following_count', -1)
+    feeds.switch_modes([instance.author_id], -1)
+    feeds.prune(instance)
+    page_cache.invalidate_follow(instance)
@@ -0,0 +1,132 @@
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+from posts.paginators import EstimatedCountPaginator
+
+User = get_user_model()
+
+
+class AdminChangeListTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='admin', password='12345'
+        )
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.group = Group.objects.create(
+            title='Тест группа', slug='test-slug', description='Описание'
+        )
+        self.unused_group = Group.objects.create(
+            title='Пустая группа', slug='empty', description='Описание'
+        )
+
+    def fill(self, count):
+        User.objects.exclude(pk=self.admin.pk).delete()
+        for number in range(count):
+            author = User.objects.create_user(username=f'author{number}')
+            post = Post.objects.create(
+                text=f'Пост {number}', author=author, group=self.group
+            )
+            Comment.objects.create(
+                post=post, author=self.admin, text='Комментарий'
+            )
+            Follow.objects.create(user=self.admin, author=author)
+
+    def queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in context]
+
+    def test_queries_do_not_grow_with_rows(self):
+        '''Число запросов changelist не зависит от числа строк.'''
+        for model in ('post', 'comment', 'follow'):
+            url = reverse(f'admin:posts_{model}_changelist')
+            with self.subTest(model=model):
+                self.fill(2)
+                few = len(self.queries(url))
+                self.fill(12)
+                self.assertEqual(len(self.queries(url)), few)
+
+    def test_comment_search_skips_post_text(self):
+        '''Поиск комментариев не сканирует тексты постов через LIKE.'''
+        self.fill(2)
+        url = reverse('admin:posts_comment_changelist') + '?q=Пост'
+        sql = ' '.join(self.queries(url))
+        self.assertNotIn('"posts_post"."text" LIKE', sql)
+
+    def test_group_select_not_rendered(self):
+        '''В list_editable нет <select> со всеми группами.'''
+        self.fill(2)
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertNotContains(response, self.unused_group.title)
+        self.assertContains(
+            response,
+            f'<option value="{self.group.pk}" selected>{self.group.title}'
+        )
+        self.assertContains(response, 'admin-autocomplete')
+
+    def test_date_hierarchy_uses_index_seeks(self):
+        '''Годы в date_hierarchy ищутся без полного прохода по таблице.'''
+        self.fill(3)
+        Post.objects.filter(text='Пост 0').update(
+            pub_date=datetime(2021, 5, 1, tzinfo=timezone.utc)
+        )
+        Post.objects.filter(text='Пост 1').update(
+            pub_date=datetime(2022, 5, 1, tzinfo=timezone.utc)
+        )
+        url = reverse('admin:posts_post_changelist')
+        response = self.client.get(url)
+        for year in ('2021', '2022'):
+            self.assertContains(response, f'?pub_date__year={year}')
+        for sql in self.queries(url):
+            self.assertNotIn('DISTINCT', sql)
+            self.assertNotIn('django_datetime_trunc', sql)
+
+    def test_month_drilldown(self):
+        '''Внутри года показываются месяцы с постами.'''
+        self.fill(2)
+        for text, month in (('Пост 0', 3), ('Пост 1', 11)):
+            Post.objects.filter(text=text).update(
+                pub_date=datetime(2021, month, 1, tzinfo=timezone.utc)
+            )
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'pub_date__year': 2021}
+        )
+        for month in (3, 11):
+            self.assertContains(
+                response, f'pub_date__month={month}&amp;pub_date__year=2021'
+            )
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    def setUp(self):
+        author = User.objects.create_user(username='author')
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=author) for number in range(8)
+        )
+
+    def test_small_count_exact(self):
+        '''Ниже лимита число строк точное.'''
+        paginator = EstimatedCountPaginator(Post.objects.all(), 3)
+        self.assertEqual(paginator.count, 8)
+
+    @mock.patch('posts.paginators.EXACT_COUNT_LIMIT', 5)
+    def test_large_count_estimated(self):
+        '''Выше лимита берётся оценка, а не COUNT(*) по всей таблице.'''
+        Post.objects.filter(text='Пост 3').delete()
+        paginator = EstimatedCountPaginator(Post.objects.all(), 3)
+        with CaptureQueriesContext(connection) as context:
+            count = paginator.count
+        self.assertGreaterEqual(count, 5)
+        self.assertFalse(
+            [query for query in context
+             if query['sql'].startswith('SELECT COUNT(*) AS "__count" FROM')]
+        )
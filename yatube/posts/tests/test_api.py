@@ -0,0 +1,285 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=cls.author, group=cls.group)
+            for number in range(25)
+        )
+        cls.post = Post.objects.create(
+            text='Последний пост', author=cls.author, group=cls.group
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest = APIClient()
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+        self.author_client = APIClient()
+        self.author_client.force_authenticate(self.author)
+
+    def test_posts_cursor_pagination(self):
+        '''Список постов листается курсором без повторов.'''
+        response = self.guest.get('/api/v1/posts/')
+        self.assertEqual(response.status_code, 200)
+        first = response.json()
+        self.assertEqual(first['results'][0]['text'], 'Последний пост')
+        self.assertEqual(first['results'][0]['author'], 'author')
+        second = self.guest.get(first['next']).json()
+        ids = [post['id'] for post in first['results'] + second['results']]
+        self.assertEqual(len(ids), 26)
+        self.assertEqual(len(set(ids)), 26)
+
+    def test_list_queries(self):
+        '''Страница постов — один запрос независимо от числа авторов.'''
+        with CaptureQueriesContext(connection) as queries:
+            self.guest.get('/api/v1/posts/')
+        self.assertEqual(len(queries), 1)
+
+    def test_sparse_fields(self):
+        '''?fields= сокращает и ответ, и выбираемые колонки.'''
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest.get('/api/v1/posts/?fields=id,excerpt')
+        self.assertEqual(
+            set(response.json()['results'][0]), {'id', 'excerpt'}
+        )
+        self.assertNotIn('"posts_post"."text"', queries[0]['sql'])
+        self.assertNotIn('auth_user', queries[0]['sql'])
+
+    def test_etag(self):
+        '''Ответ 304, пока данные не изменились; комментарий меняет ETag.'''
+        urls = (
+            '/api/v1/posts/',
+            f'/api/v1/posts/{self.post.pk}/',
+            f'/api/v1/posts/{self.post.pk}/comments/',
+            '/api/v1/groups/',
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                etag = self.guest.get(url)['ETag']
+                response = self.guest.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+        etag = self.guest.get('/api/v1/posts/')['ETag']
+        Comment.objects.create(
+            post=self.post, author=self.author, text='Новый комментарий'
+        )
+        response = self.guest.get('/api/v1/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_create_post(self):
+        '''Пост создаёт авторизованный пользователь, гость — нет.'''
+        data = {'text': 'Пост из API', 'group': self.group.pk}
+        self.assertEqual(
+            self.guest.post('/api/v1/posts/', data).status_code, 401
+        )
+        response = self.client.post('/api/v1/posts/', data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['author'], 'reader')
+        self.assertEqual(response.json()['excerpt'], 'Пост из API')
+
+    def test_only_author_edits(self):
+        '''Изменить и удалить пост может только автор.'''
+        url = f'/api/v1/posts/{self.post.pk}/'
+        self.assertEqual(
+            self.client.patch(url, {'text': 'Чужой'}).status_code, 403
+        )
+        response = self.author_client.patch(url, {'text': 'Исправлено'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.author_client.delete(url).status_code, 204)
+
+    def test_comments(self):
+        '''Комментарии поста и создание комментария.'''
+        url = f'/api/v1/posts/{self.post.pk}/comments/'
+        self.assertEqual(
+            self.guest.get(url).json()['results'][0]['text'], 'Комментарий'
+        )
+        response = self.client.post(url, {'text': 'Ещё'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['post'], self.post.pk)
+        self.assertEqual(
+            self.guest.get('/api/v1/posts/0/comments/').status_code, 404
+        )
+
+    def test_follow(self):
+        '''Подписка по имени автора, без повторов и на себя.'''
+        url = '/api/v1/follow/'
+        self.assertEqual(self.guest.get(url).status_code, 401)
+        response = self.client.post(url, {'author': 'author'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            response.json(), {
+                'id': Follow.objects.get().pk,
+                'user': 'reader',
+                'author': 'author',
+            }
+        )
+        self.assertEqual(
+            self.client.post(url, {'author': 'author'}).status_code, 400
+        )
+        self.assertEqual(
+            self.client.post(url, {'author': 'reader'}).status_code, 400
+        )
+        self.assertEqual(
+            self.client.get(url).json()['results'][0]['author'], 'author'
+        )
+
+
+class BatchApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='user')
+        cls.authors = [
+            User.objects.create_user(username=f'author{number}')
+            for number in range(5)
+        ]
+        cls.posts = [
+            Post.objects.create(text=f'Пост {author}', author=author)
+            for author in cls.authors
+        ]
+        Follow.objects.create(user=cls.user, author=cls.authors[0])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def profile(self, user):
+        user.profile.refresh_from_db()
+        return user.profile
+
+    def test_follow_batch(self):
+        '''Подписка списком: статус для каждого имени, счётчики и ленты.'''
+        response = self.client.post('/api/v1/follow/batch/', {
+            'follow': [
+                'author0', 'author1', 'author2', 'author1', 'nobody', 'user'
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['follow'], [
+            {'username': 'author0', 'status': 'exists'},
+            {'username': 'author1', 'status': 'created'},
+            {'username': 'author2', 'status': 'created'},
+            {'username': 'nobody', 'status': 'not_found'},
+            {'username': 'user', 'status': 'self'},
+        ])
+        self.assertEqual(
+            set(self.user.follower.values_list(
+                'author__username', flat=True
+            )),
+            {'author0', 'author1', 'author2'}
+        )
+        self.assertEqual(self.profile(self.user).following_count, 3)
+        self.assertEqual(self.profile(self.authors[1]).followers_count, 1)
+        self.assertEqual(
+            set(self.user.feed_items.values_list('post_id', flat=True)),
+            {post.pk for post in self.posts[:3]}
+        )
+
+    def test_unfollow_batch(self):
+        '''Отписка списком убирает подписки, счётчики и записи ленты.'''
+        self.client.post('/api/v1/follow/batch/', {
+            'follow': ['author1'],
+        }, format='json')
+        response = self.client.post('/api/v1/follow/batch/', {
+            'unfollow': ['author0', 'author1', 'author3', 'nobody'],
+        }, format='json')
+        self.assertEqual(response.json()['unfollow'], [
+            {'username': 'author0', 'status': 'deleted'},
+            {'username': 'author1', 'status': 'deleted'},
+            {'username': 'author3', 'status': 'not_following'},
+            {'username': 'nobody', 'status': 'not_found'},
+        ])
+        self.assertFalse(self.user.follower.exists())
+        self.assertFalse(self.user.feed_items.exists())
+        self.assertEqual(self.profile(self.user).following_count, 0)
+        self.assertEqual(self.profile(self.authors[0]).followers_count, 0)
+
+    def test_follow_batch_concurrent_follow(self):
+        '''Подписка, созданная параллельно с пачкой, учтена один раз.'''
+        started = []
+
+        def follow_first(execute, sql, params, many, context):
+            if not started and 'INSERT' in sql and 'posts_follow' in sql:
+                started.append(sql)
+                Follow.objects.create(user=self.user, author=self.authors[1])
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(follow_first):
+            response = self.client.post('/api/v1/follow/batch/', {
+                'follow': ['author1', 'author2'],
+            }, format='json')
+        self.assertEqual(response.json()['follow'], [
+            {'username': 'author1', 'status': 'exists'},
+            {'username': 'author2', 'status': 'created'},
+        ])
+        self.assertEqual(self.profile(self.user).following_count, 3)
+        self.assertEqual(self.profile(self.authors[1]).followers_count, 1)
+
+    def test_follow_batch_queries(self):
+        '''Число запросов не зависит от размера пачки.'''
+        def queries(usernames):
+            with CaptureQueriesContext(connection) as captured:
+                self.client.post('/api/v1/follow/batch/', {
+                    'follow': usernames, 'unfollow': usernames,
+                }, format='json')
+            return len(captured)
+        self.assertEqual(
+            queries(['author1']),
+            queries([f'author{number}' for number in range(1, 5)])
+        )
+
+    def test_follow_batch_limit(self):
+        '''Пачка больше лимита отклоняется целиком.'''
+        response = self.client.post('/api/v1/follow/batch/', {
+            'follow': ['author1'] * 1001,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_follow_batch_evicts_feed(self):
+        '''После пачки лента подписок сразу показывает новых авторов.'''
+        client = Client()
+        client.force_login(self.user)
+        client.get(reverse('posts:follow_index'))
+        self.client.post('/api/v1/follow/batch/', {
+            'follow': ['author4'],
+        }, format='json')
+        self.assertContains(
+            client.get(reverse('posts:follow_index')), 'Пост author4'
+        )
+
+    def test_posts_batch(self):
+        '''Посты по списку id одним запросом, в порядке запроса.'''
+        ids = [self.posts[2].pk, 0, self.posts[0].pk]
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(
+                '/api/v1/posts/batch/',
+                {'ids': ','.join(map(str, ids)), 'fields': 'id,text'}
+            )
+        self.assertEqual(len(captured), 1)
+        self.assertEqual(response.json()['results'], [
+            {'id': ids[0], 'status': 'ok',
+             'post': {'id': ids[0], 'text': 'Пост author2'}},
+            {'id': 0, 'status': 'not_found'},
+            {'id': ids[2], 'status': 'ok',
+             'post': {'id': ids[2], 'text': 'Пост author0'}},
+        ])
+        self.assertEqual(
+            self.client.get('/api/v1/posts/batch/?ids=1,x').status_code, 400
+        )
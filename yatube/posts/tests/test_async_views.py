@@ -0,0 +1,108 @@
+import asyncio
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.test import AsyncRequestFactory, TestCase, override_settings
+
+from core.middleware import PerformanceMiddleware, ReplicaMiddleware
+from posts import async_views
+from posts.models import Comment, Follow, Group, Post, User
+from posts.page_cache import INDEX, cached_feed
+
+
+class AsyncViewsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Асинхронный пост', author=cls.author, group=cls.group
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий читателя'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+
+    def request(self, path, user=None):
+        request = self.factory.get(path)
+        request.user = user or AnonymousUser()
+        return request
+
+    async def page(self, view, *args, user=None):
+        response = await view(self.request('/', user), *args)
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    async def test_feeds(self):
+        '''Главная, группа и лента подписок показывают пост.'''
+        self.assertIn('Асинхронный пост', await self.page(async_views.index))
+        self.assertIn('Асинхронный пост', await self.page(
+            async_views.group_posts, 'group'
+        ))
+        self.assertIn('Асинхронный пост', await self.page(
+            async_views.follow_index, user=self.reader
+        ))
+
+    async def test_profile_following(self):
+        '''Профиль показывает подписку читателя на автора.'''
+        self.assertIn('Отписаться', await self.page(
+            async_views.profile, 'author', user=self.reader
+        ))
+        self.assertNotIn('Отписаться', await self.page(
+            async_views.profile, 'author'
+        ))
+
+    async def test_post_detail(self):
+        '''Страница поста выводит комментарии.'''
+        content = await self.page(async_views.post_detail, self.post.pk)
+        self.assertIn('Комментарий читателя', content)
+
+    async def test_not_found(self):
+        with self.assertRaises(Http404):
+            await async_views.group_posts(self.request('/'), 'missing')
+
+    async def test_single_flight(self):
+        '''Одновременные запросы одной страницы собирают её один раз.'''
+        calls = []
+
+        @cached_feed(lambda request: (INDEX,))
+        async def view(request):
+            calls.append(request)
+            await asyncio.sleep(0.05)
+            return HttpResponse('Страница')
+
+        responses = await asyncio.gather(*(
+            view(self.request('/')) for _ in range(5)
+        ))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(
+            {response.content for response in responses},
+            {'Страница'.encode()}
+        )
+
+    async def test_follow_index_requires_login(self):
+        response = await async_views.follow_index(self.request('/follow/'))
+        self.assertEqual(response.status_code, 302)
+
+
+@override_settings(PERF_METRICS=True, REPLICA_DATABASES=['replica1'])
+class AsyncMiddlewareTest(TestCase):
+    def test_middleware_stays_async(self):
+        '''Под ASGI middleware не переводит цепочку в синхронный режим.'''
+        async def view(request):
+            return HttpResponse()
+
+        for middleware in (PerformanceMiddleware, ReplicaMiddleware):
+            self.assertTrue(iscoroutinefunction(middleware(view)))
+            self.assertFalse(iscoroutinefunction(
+                middleware(lambda request: HttpResponse())
+            ))
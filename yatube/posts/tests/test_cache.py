@@ -1,9 +1,19 @@
+from unittest import mock
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.test import Client, TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from posts.models import Post
+from core.metrics import registry
+from posts import page_cache
+from posts.models import Comment, Follow, Group, Post, Profile
+from yatube.env import cache_from_url
 
 User = get_user_model()
 
@@ -16,38 +26,228 @@ class CacheTest(TestCase):
             username='volodia',
             password='12345'
         )
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тест группа',
+            slug='test-slug',
+            description='Тест описание'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
 
     def setUp(self):
         cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.post = Post.objects.create(
+            text='Создан тестовый пост',
+            author=self.user,
+            group=self.group
+        )
+        self.urls = {
+            reverse('posts:index'): self.authorized_client,
+            reverse(
+                'posts:group_list', kwargs={'slug': self.group.slug}
+            ): self.authorized_client,
+            reverse(
+                'posts:profile', kwargs={'username': self.user}
+            ): self.authorized_client,
+            reverse('posts:follow_index'): self.reader_client,
+        }
 
     def tearDown(self):
         cache.clear()
 
     def test_cache(self):
-        """Тест кеша главной страницы"""
-        form_data = {
-            'text': 'Создан тестовый пост'
-        }
-        response = self.authorized_client.post(
-            reverse('posts:post_create'),
-            data=form_data,
-            follow=True
+        '''Повторный запрос ленты отдаётся из кеша.'''
+        for url, client in self.urls.items():
+            client.get(url)
+        Post.objects.filter(pk=self.post.pk).update(text='Без сигнала')
+        for url, client in self.urls.items():
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertIsNone(response.context)
+                self.assertIn(
+                    'Создан тестовый пост', response.content.decode()
+                )
+
+    def test_delete_invalidates_feeds(self):
+        '''Удалённый пост после коммита пропадает из всех лент
+        без cache.clear().'''
+        for url, client in self.urls.items():
+            client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        for url, client in self.urls.items():
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertNotIn(
+                    'Создан тестовый пост', response.content.decode()
+                )
+
+    def test_edit_invalidates_feeds(self):
+        '''Отредактированный пост после коммита виден в лентах.'''
+        for url, client in self.urls.items():
+            client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authorized_client.post(
+                reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+                data={'text': 'Исправленный пост', 'group': self.group.pk}
+            )
+        for url, client in self.urls.items():
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertIn('Исправленный пост', response.content.decode())
+
+    def test_pages_cached_per_user(self):
+        '''Страница одного пользователя не отдаётся другому.'''
+        url = reverse('posts:index')
+        self.authorized_client.get(url)
+        response = self.reader_client.get(url)
+        self.assertIsNotNone(response.context)
+        self.assertIn('Пользователь: reader', response.content.decode())
+
+    def cached(self, url, client):
+        return client.get(url).context is None
+
+    def test_evicts_only_affected_pages(self):
+        '''Изменения сбрасывают только ленты, где они видны.'''
+        index = reverse('posts:index')
+        group = reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        changes = (
+            (lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='Комментарий'
+            ), ()),
+            (lambda: Group.objects.filter(pk=self.group.pk).get().save(),
+             (group,)),
+            (lambda: Post.objects.create(
+                text='Пост без группы', author=self.reader
+            ), (index,)),
         )
-        response = self.authorized_client.get(reverse('posts:index'))
-        first_post = response.content
+        for change, evicted in changes:
+            for url, client in self.urls.items():
+                client.get(url)
+            change()
+            for url, client in self.urls.items():
+                with self.subTest(change=change, url=url):
+                    self.assertEqual(
+                        self.cached(url, client), url not in evicted
+                    )
 
-        Post.objects.filter(text=form_data['text']).delete()
+    def test_group_rename_evicts_cards(self):
+        '''Новое название группы сразу видно в карточках постов лент.'''
+        for url, client in self.urls.items():
+            client.get(url)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        for url, client in self.urls.items():
+            with self.subTest(url=url):
+                self.assertIn(
+                    'Новое название', client.get(url).content.decode()
+                )
 
-        response_second = self.authorized_client.get(reverse('posts:index'))
-        first_post_after_del = response_second.content
+    def test_user_save_keeps_feeds(self):
+        '''Сохранение пользователя без смены имени ленты не сбрасывает.'''
+        user = User.objects.get(pk=self.user.pk)
+        changes = (
+            lambda: user.save(),
+            lambda: setattr(user, 'is_staff', True) or user.save(),
+            lambda: User.objects.get(pk=self.reader.pk).save(
+                update_fields=['is_active']
+            ),
+        )
+        for change in changes:
+            for url, client in self.urls.items():
+                client.get(url)
+            change()
+            for url, client in self.urls.items():
+                with self.subTest(change=change, url=url):
+                    self.assertTrue(self.cached(url, client))
 
-        self.assertEqual(first_post, first_post_after_del)
+    def test_author_rename_evicts_cards(self):
+        '''Новое имя автора сразу видно в карточках постов лент.'''
+        for url, client in self.urls.items():
+            client.get(url)
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Владимир'
+        user.save(update_fields=['first_name'])
+        for url, client in self.urls.items():
+            with self.subTest(url=url):
+                self.assertIn('Владимир', client.get(url).content.decode())
+
+    def test_counters(self):
+        '''Попадания, промахи и сброшенные ленты попадают в /metrics.'''
+        registry.reset()
+        url = reverse('posts:index')
+        self.authorized_client.get(url)
+        self.authorized_client.get(url)
+        self.post.delete()
+        counters = registry.page_cache
+        self.assertEqual(
+            counters['yatube_page_cache_hits_total'], {'index': 1}
+        )
+        self.assertEqual(
+            counters['yatube_page_cache_misses_total'], {'index': 1}
+        )
+        evictions = counters['yatube_page_cache_evictions_total']
+        self.assertEqual(evictions['index'], 1)
+        self.assertEqual(evictions['group'], 1)
+        self.assertEqual(evictions['profile'], 1)
+        self.assertIn(
+            'yatube_page_cache_hits_total{view="index"} 1',
+            registry.exposition()
+        )
+
+    def test_single_flight(self):
+        '''Пока страницу собирает другой запрос, view не вызывается.'''
+        ready = HttpResponse('собрано другим запросом')
+        with mock.patch('posts.page_cache.cache.add', return_value=False), \
+                mock.patch('posts.page_cache.wait_for', return_value=ready):
+            response = self.authorized_client.get(reverse('posts:index'))
+        self.assertEqual(response.content.decode(), 'собрано другим запросом')
+
+    def test_lock_wait_falls_back_to_render(self):
+        '''Если дождаться страницу не удалось, запрос собирает её сам.'''
+        with mock.patch('posts.page_cache.cache.add', return_value=False), \
+                self.settings(FEED_PAGE_LOCK_WAIT=0):
+            response = self.authorized_client.get(reverse('posts:index'))
+        self.assertIn('Создан тестовый пост', response.content.decode())
 
-        cache.clear()
 
-        response_after_del = self.authorized_client.get(reverse('posts:index'))
-        first_post_after_del_cache = response_after_del.content
+@override_settings(CACHES={'default': cache_from_url(None, settings.BASE_DIR)})
+class DefaultBackendTest(TestCase):
+    FOLLOWERS = 3000
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('createcachetable', verbosity=0)
+        cls.author = User.objects.create_user(username='volodia')
+        readers = User.objects.bulk_create(
+            User(username=f'reader{number}')
+            for number in range(cls.FOLLOWERS)
+        )
+        Follow.objects.bulk_create(
+            Follow(user=reader, author=cls.author) for reader in readers
+        )
+        Profile.objects.filter(user=cls.author).update(
+            followers_count=cls.FOLLOWERS
+        )
+        cls.reader = readers[-1]
 
-        self.assertNotEqual(first_post_after_del, first_post_after_del_cache)
+    def test_post_by_popular_author(self):
+        '''Пост автора с тысячами подписчиков создаётся без записи их
+        поколений в транзакции; ленты подписчиков сбрасываются после.'''
+        key = page_cache.generation_key(page_cache.feed_scope(self.reader.pk))
+        generation = page_cache.generation_values(
+            [page_cache.feed_scope(self.reader.pk)]
+        )[0]
+        with self.captureOnCommitCallbacks() as callbacks:
+            with CaptureQueriesContext(connection) as queries:
+                Post.objects.create(text='Новый пост', author=self.author)
+        self.assertLess(len(queries), 50)
+        self.assertEqual(cache.get(key), generation)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(cache.get(key), generation)
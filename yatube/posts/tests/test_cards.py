@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import cards
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='volodia')
+        self.group = Group.objects.create(
+            title='Тест группа',
+            slug='test-slug',
+            description='Тест описание'
+        )
+        self.post = Post.objects.create(
+            text='Тест текст',
+            author=self.user,
+            group=self.group
+        )
+        self.guest_client = Client()
+        self.urls = (
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def content(self, url):
+        return self.guest_client.get(url).content.decode()
+
+    def test_card_served_from_cache(self):
+        '''Повторный рендер берёт карточку из кеша.'''
+        for url in self.urls:
+            self.content(url)
+        Post.objects.filter(pk=self.post.pk).update(text='Без сигнала')
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertIn('Тест текст', self.content(url))
+
+    def test_post_save_invalidates_card(self):
+        '''Сохранение поста сбрасывает его карточку.'''
+        for url in self.urls:
+            self.content(url)
+        self.post.text = 'Исправленный текст'
+        self.post.save()
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertIn('Исправленный текст', self.content(url))
+
+    def test_group_save_invalidates_card(self):
+        '''Переименование группы сбрасывает карточки её постов.'''
+        url = self.urls[1]
+        self.content(url)
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertIn('все записи группы Новое название', self.content(url))
+
+    def test_card_timeout(self):
+        '''Фрагмент карточки живёт CARD_TIMEOUT секунд.'''
+        with mock.patch.object(cards, 'CARD_TIMEOUT', 5), \
+                mock.patch('django.templatetags.cache.caches') as caches:
+            caches.__getitem__.return_value.get.return_value = None
+            self.content(self.urls[0])
+        timeouts = {
+            call.args[2] for call in
+            caches.__getitem__.return_value.set.call_args_list
+        }
+        self.assertEqual(timeouts, {5})
@@ -0,0 +1,81 @@
+import tracemalloc
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Post, User
+
+COMMENTS = 100000
+PER_PAGE = 20
+
+
+@override_settings(COMMENTS_PER_PAGE=PER_PAGE)
+class CommentPaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(
+            text='Вирусный пост', author=cls.author
+        )
+        Comment.objects.bulk_create(
+            (Comment(post=cls.post, author=cls.author, text=f'Комментарий {n}')
+             for n in range(COMMENTS)),
+            batch_size=5000
+        )
+        Post.objects.filter(pk=cls.post.pk).update(comments_count=COMMENTS)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_first_page_inline(self):
+        '''Страница поста выводит только первые комментарии.'''
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+        comments = response.context['comments']
+        self.assertEqual(len(comments), PER_PAGE)
+        self.assertEqual(comments[0].text, 'Комментарий 0')
+        self.assertTrue(comments.has_next())
+        self.assertContains(response, 'Показать ещё комментарии')
+
+    def test_next_pages(self):
+        '''Фрагмент по курсору продолжает список без пропусков и повторов.'''
+        url = reverse('posts:post_comments', args=(self.post.pk,))
+        page = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        ).context['comments']
+        texts = [comment.text for comment in page]
+        for _ in range(3):
+            page = self.client.get(
+                url, {'cursor': page.next_cursor}
+            ).context['comments']
+            texts += [comment.text for comment in page]
+        self.assertEqual(
+            texts, [f'Комментарий {n}' for n in range(PER_PAGE * 4)]
+        )
+
+    def test_bounded_cost(self):
+        '''Стоимость страницы не зависит от числа комментариев поста.'''
+        urls = (
+            reverse('posts:post_detail', args=(self.post.pk,)),
+            reverse('posts:post_comments', args=(self.post.pk,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                tracemalloc.start()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(len(queries), 4)
+                self.assertLess(peak, 5 * 2 ** 20)
+
+    def test_missing_post(self):
+        '''Комментарии несуществующего поста — 404.'''
+        response = self.client.get(reverse('posts:post_comments', args=(0,)))
+        self.assertEqual(response.status_code, 404)
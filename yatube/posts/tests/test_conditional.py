@@ -0,0 +1,121 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+
+from posts.models import Comment, Group, Post, User
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Условный пост', author=cls.author, group=cls.group
+        )
+        cls.pages = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=('group',)),
+            reverse('posts:profile', args=('author',)),
+            reverse('posts:post_detail', args=(cls.post.pk,)),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def revalidate(self, client, path):
+        etag = client.get(path)['ETag']
+        return client.get(path, HTTP_IF_NONE_MATCH=etag)
+
+    def test_not_modified(self):
+        '''Повторный запрос с If-None-Match получает 304 без тела.'''
+        for path in self.pages:
+            with self.subTest(path=path):
+                response = self.revalidate(self.client, path)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+                self.assertIn('Last-Modified', response)
+
+    def test_not_modified_queries(self):
+        '''304 стоит не больше одного небольшого запроса к БД.'''
+        for client in (self.client, self.author_client):
+            for path in self.pages:
+                etag = client.get(path)['ETag']
+                with self.subTest(path=path), CaptureQueriesContext(
+                    connection
+                ) as queries:
+                    response = client.get(path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                # Ленты отвечают по кешу, сессия тоже читается из кеша;
+                # странице поста нужен запрос валидаторов.
+                limit = int(path == self.pages[-1])
+                self.assertLessEqual(len(queries), limit, [
+                    query['sql'] for query in queries.captured_queries
+                ])
+
+    def test_changes(self):
+        '''Новый пост и правка меняют ETag лент, комментарий — поста.'''
+        detail = self.pages[-1]
+        changes = (
+            (self.pages, lambda: Post.objects.create(
+                text='Новый пост', author=self.author, group=self.group
+            )),
+            (self.pages, lambda: self.author_client.post(
+                reverse('posts:post_edit', args=(self.post.pk,)),
+                {'text': 'Исправленный пост', 'group': self.group.pk}
+            )),
+            ((detail,), lambda: Comment.objects.create(
+                post=self.post, author=self.author, text='Комментарий'
+            )),
+        )
+        for pages, change in changes:
+            etags = {path: self.client.get(path)['ETag'] for path in pages}
+            change()
+            for path, etag in etags.items():
+                with self.subTest(path=path):
+                    response = self.client.get(
+                        path, HTTP_IF_NONE_MATCH=etag
+                    )
+                    self.assertEqual(response.status_code, 200)
+                    self.assertNotEqual(response['ETag'], etag)
+        response = self.revalidate(self.client, self.pages[0])
+        self.assertEqual(response.status_code, 304)
+
+    def test_viewer(self):
+        '''Гость и автор получают разные ETag одной страницы.'''
+        for path in self.pages:
+            with self.subTest(path=path):
+                self.assertNotEqual(
+                    self.client.get(path)['ETag'],
+                    self.author_client.get(path)['ETag']
+                )
+                self.assertIn('Cookie', self.client.get(path)['Vary'])
+
+    def test_if_modified_since(self):
+        '''Страница поста отвечает 304 на If-Modified-Since.'''
+        path = reverse('posts:post_detail', args=(self.post.pk,))
+        last_modified = self.client.get(path)['Last-Modified']
+        response = self.client.get(
+            path, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(path, HTTP_IF_MODIFIED_SINCE=http_date(
+            self.post.pub_date.timestamp() - 3600
+        ))
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_post(self):
+        '''Для несуществующего поста валидаторов нет — обычный 404.'''
+        response = self.client.get(
+            reverse('posts:post_detail', args=(0,)),
+            HTTP_IF_NONE_MATCH='"x"'
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,99 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post, Profile
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.authorized_reader = Client()
+        self.authorized_reader.force_login(self.reader)
+
+    def profile(self, user):
+        return Profile.objects.get(user=user)
+
+    def test_profile_created_with_user(self):
+        '''Профиль со счётчиками создаётся вместе с пользователем.'''
+        self.assertEqual(self.profile(self.author).posts_count, 0)
+
+    def test_posts_count(self):
+        '''posts_count растёт при создании поста и падает при удалении.'''
+        post = Post.objects.create(text='Пост', author=self.author)
+        self.assertEqual(self.profile(self.author).posts_count, 1)
+        post.delete()
+        self.assertEqual(self.profile(self.author).posts_count, 0)
+
+    def test_comments_count(self):
+        '''comments_count не затирается при редактировании поста.'''
+        post = Post.objects.create(text='Пост', author=self.author)
+        self.authorized_reader.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            data={'text': 'Комментарий'}
+        )
+        post.text = 'Исправленный пост'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        Comment.objects.filter(post=post).delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_follow_counts(self):
+        '''Подписка меняет счётчики подписчиков и подписок.'''
+        self.authorized_reader.get(reverse(
+            'posts:profile_follow', kwargs={'username': self.author}
+        ))
+        self.assertEqual(self.profile(self.author).followers_count, 1)
+        self.assertEqual(self.profile(self.reader).following_count, 1)
+        self.authorized_reader.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': self.author}
+        ))
+        self.assertEqual(self.profile(self.author).followers_count, 0)
+        self.assertEqual(self.profile(self.reader).following_count, 0)
+
+    def test_pages_of_user_without_profile(self):
+        '''Профиль пользователя, созданного в обход сигналов, создаётся
+        при открытии его страниц со счётчиками из БД.'''
+        imported, = User.objects.bulk_create([User(username='imported')])
+        post = Post.objects.create(text='Пост', author=imported)
+        Follow.objects.create(user=self.reader, author=imported)
+        urls = (
+            reverse('posts:profile', kwargs={'username': imported.username}),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_reader.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.context['post_count'], 1)
+        profile = self.profile(imported)
+        self.assertEqual(
+            (profile.posts_count, profile.followers_count), (1, 1)
+        )
+
+    def test_rebuild_counters_repairs_drift(self):
+        '''Команда rebuild_counters исправляет рассинхронизацию.'''
+        post = Post.objects.create(text='Пост', author=self.author)
+        Comment.objects.create(post=post, author=self.reader, text='К')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Profile.objects.update(
+            posts_count=7, followers_count=7, following_count=7
+        )
+        Post.objects.update(comments_count=7)
+        Profile.objects.filter(user=self.reader).delete()
+        call_command('rebuild_counters', stdout=StringIO())
+        author = self.profile(self.author)
+        self.assertEqual(
+            (author.posts_count, author.followers_count), (1, 1)
+        )
+        self.assertEqual(self.profile(self.reader).following_count, 1)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
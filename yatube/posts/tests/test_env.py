@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from yatube.env import database_from_url, replica_databases
+
+
+class DatabaseUrlTest(SimpleTestCase):
+    def test_sqlite_paths(self):
+        '''Относительный путь SQLite — от BASE_DIR, абсолютный — как есть.'''
+        self.assertEqual(
+            database_from_url(None, '/app')['NAME'], '/app/db.sqlite3'
+        )
+        self.assertEqual(
+            database_from_url('sqlite:////data/db.sqlite3', '/app')['NAME'],
+            '/data/db.sqlite3'
+        )
+
+    def test_postgres(self):
+        '''URL Postgres раскладывается на параметры соединения.'''
+        config = database_from_url(
+            'postgres://blog:p%40ss@db:6432/yatube?sslmode=require', '/app'
+        )
+        self.assertEqual(config['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(
+            (config['NAME'], config['USER'], config['PASSWORD']),
+            ('yatube', 'blog', 'p@ss')
+        )
+        self.assertEqual((config['HOST'], config['PORT']), ('db', '6432'))
+        self.assertEqual(config['OPTIONS'], {'sslmode': 'require'})
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+
+    def test_unknown_scheme(self):
+        with self.assertRaises(ValueError):
+            database_from_url('mysql://db/yatube', '/app')
+
+    def test_replicas(self):
+        '''Реплики задаются файлами SQLite или URL и зеркалируют default.'''
+        replicas = replica_databases(
+            'replica.sqlite3 postgres://reader@replica/yatube', '/app'
+        )
+        self.assertEqual(replicas['replica1']['NAME'], '/app/replica.sqlite3')
+        self.assertEqual(replicas['replica2']['HOST'], 'replica')
+        self.assertEqual(replicas['replica2']['TEST'], {'MIRROR': 'default'})
+
+
+class TestCacheTest(SimpleTestCase):
+    def test_tests_use_memory_cache(self):
+        '''cache.clear() в тестах не трогает рабочий кеш на диске.'''
+        self.assertEqual(
+            settings.CACHES['default']['BACKEND'],
+            'django.core.cache.backends.locmem.LocMemCache'
+        )
@@ -0,0 +1,76 @@
+import io
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template.defaultfilters import truncatewords
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.excerpts import summarize
+from posts.models import Post, User
+
+LONG_TEXT = ' '.join(f'слово{number}' for number in range(100))
+
+
+class ExcerptTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def test_summarize(self):
+        '''Анонс совпадает с выводом truncatewords:30.'''
+        for text in (LONG_TEXT, 'Короткий\nпост', 'Один'):
+            with self.subTest(text=text):
+                fields = summarize(text)
+                self.assertEqual(fields['excerpt'], truncatewords(text, 30))
+                self.assertEqual(fields['word_count'], len(text.split()))
+
+    def test_form_save(self):
+        '''Анонс считается при создании и правке поста через форму.'''
+        self.client.post(reverse('posts:post_create'), {'text': LONG_TEXT})
+        post = Post.objects.get()
+        self.assertEqual(post.excerpt, truncatewords(LONG_TEXT, 30))
+        self.assertEqual(post.word_count, 100)
+        self.client.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            {'text': 'Исправленный пост'}
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'Исправленный пост')
+        self.assertEqual(post.word_count, 2)
+
+    def test_update_fields(self):
+        '''Сохранение с update_fields пересчитывает анонс только с текстом.'''
+        post = Post.objects.create(text='Старый текст', author=self.author)
+        post.text = 'Новый текст поста'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.word_count, 3)
+        Post.objects.filter(pk=post.pk).update(excerpt='')
+        post.save(update_fields=['thumbnails'])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, '')
+
+    def test_backfill(self):
+        '''Команда заполняет анонсы постов, созданных в обход save().'''
+        Post.objects.bulk_create(
+            Post(text=LONG_TEXT, author=self.author) for _ in range(5)
+        )
+        call_command('backfill_excerpts', batch_size=2, stdout=io.StringIO())
+        self.assertEqual(
+            set(Post.objects.values_list('excerpt', 'word_count')),
+            {(truncatewords(LONG_TEXT, 30), 100)}
+        )
+
+    def test_card_renders_excerpt(self):
+        '''Карточка в ленте выводит сохранённый анонс, а не текст.'''
+        post = Post.objects.create(text=LONG_TEXT, author=self.author)
+        Post.objects.filter(pk=post.pk).update(excerpt='Сохранённый анонс')
+        content = self.client.get(reverse('posts:index')).content.decode()
+        self.assertIn('Сохранённый анонс', content)
+        self.assertNotIn('слово0', content)
@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import FeedItem, Follow, Post
+
+User = get_user_model()
+
+
+class FollowFeedTest(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.old_post = Post.objects.create(text='Старый', author=self.author)
+        self.authorized_reader = Client()
+        self.authorized_reader.force_login(self.reader)
+
+    def follow(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+
+    def feed_posts(self, **params):
+        response = self.authorized_reader.get(
+            reverse('posts:follow_index'), params
+        )
+        return list(response.context['page_obj'])
+
+    def test_follow_backfills_feed(self):
+        '''Подписка переносит в ленту уже опубликованные посты автора.'''
+        self.follow()
+        self.assertEqual(self.feed_posts(), [self.old_post])
+
+    def test_new_post_pushed_to_followers(self):
+        '''Новый пост сразу попадает в ленты подписчиков.'''
+        self.follow()
+        post = Post.objects.create(text='Новый', author=self.author)
+        self.assertTrue(
+            FeedItem.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(self.feed_posts(), [post, self.old_post])
+
+    def test_unfollow_prunes_feed(self):
+        '''Отписка удаляет посты автора из ленты.'''
+        self.follow()
+        Follow.objects.filter(user=self.reader, author=self.author).delete()
+        self.assertFalse(FeedItem.objects.filter(user=self.reader).exists())
+        self.assertEqual(self.feed_posts(), [])
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_pull_mode_for_popular_authors(self):
+        '''Посты популярных авторов не рассылаются, а читаются с лентой.'''
+        self.follow()
+        post = Post.objects.create(text='Новый', author=self.author)
+        self.assertFalse(FeedItem.objects.filter(user=self.reader).exists())
+        self.assertEqual(self.feed_posts(), [post, self.old_post])
+        self.assertEqual(
+            self.feed_posts(cursor=''), [post, self.old_post]
+        )
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_feed_request_does_not_write(self):
+        '''Запрос ленты с pull-авторами ничего не пишет в БД.'''
+        self.follow()
+        with CaptureQueriesContext(connection) as queries:
+            self.feed_posts()
+        self.assertEqual([
+            query['sql'] for query in queries.captured_queries
+            if not query['sql'].startswith(('SELECT', 'SAVEPOINT',
+                                            'RELEASE'))
+        ], [])
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_fanout_limit_crossing(self):
+        '''Пересечение порога переключает автора без потери постов.'''
+        self.follow()
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=other, author=self.author)
+        self.assertFalse(
+            FeedItem.objects.filter(author=self.author).exists()
+        )
+        post = Post.objects.create(text='Новый', author=self.author)
+        self.assertEqual(self.feed_posts(), [post, self.old_post])
+        Follow.objects.filter(user=other).delete()
+        self.assertEqual(
+            set(FeedItem.objects.filter(user=self.reader).values_list(
+                'post_id', flat=True
+            )),
+            {post.pk, self.old_post.pk}
+        )
+        cache.clear()
+        self.assertEqual(self.feed_posts(), [post, self.old_post])
+
+    def test_cursor_pagination(self):
+        '''Лента подписок листается курсором.'''
+        self.follow()
+        posts = [
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+            for i in range(12)
+        ]
+        response = self.authorized_reader.get(
+            reverse('posts:follow_index'), {'cursor': ''}
+        )
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), posts[::-1][:10])
+        self.assertEqual(
+            self.feed_posts(cursor=page_obj.next_cursor),
+            [posts[1], posts[0], self.old_post]
+        )
@@ -119,11 +119,12 @@ class FollowersTest(TestCase):
         form_data = {
             'text': 'Новый пост'
         }
-        self.authorized_author.post(
-            self.url['post_create'],
-            data=form_data,
-            follow=True
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authorized_author.post(
+                self.url['post_create'],
+                data=form_data,
+                follow=True
+            )
         self.assertEqual(Post.objects.count(), posts_count + 1)
 
         reresponse = self.authorized_subscriber.get(self.url['follow_index'])
@@ -0,0 +1,99 @@
+import io
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.forms import PostForm
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_file(size=(400, 200), image_format='JPEG', name='image.jpg'):
+    content = io.BytesIO()
+    Image.new('RGB', size, 'blue').save(content, image_format)
+    return SimpleUploadedFile(name, content.getvalue())
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    POST_IMAGE_MAX_PIXELS=10 ** 6,
+    POST_IMAGE_MAX_SIDE=100
+)
+class PostImageValidationTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def form(self, upload):
+        return PostForm(data={'text': 'Тест текст'}, files={'image': upload})
+
+    def assertRejected(self, upload, code):
+        form = self.form(upload)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors.as_data()['image'][0].code, code)
+
+    def test_small_image_kept(self):
+        '''Картинка в пределах лимитов сохраняется как есть.'''
+        upload = image_file(size=(80, 40))
+        content = upload.read()
+        upload.seek(0)
+        form = self.form(upload)
+        self.assertTrue(form.is_valid(), form.errors)
+        image = form.cleaned_data['image']
+        image.seek(0)
+        self.assertEqual(image.read(), content)
+
+    def test_large_image_downscaled(self):
+        '''Слишком большой оригинал уменьшается по большей стороне.'''
+        form = self.form(image_file(size=(400, 200)))
+        self.assertTrue(form.is_valid(), form.errors)
+        with Image.open(form.cleaned_data['image']) as image:
+            self.assertEqual(image.size, (100, 50))
+            self.assertEqual(image.format, 'JPEG')
+
+    def test_downscaled_image_saved(self):
+        '''Уменьшенная картинка сохраняется в пост.'''
+        user = User.objects.create_user(username='volodia')
+        client = Client()
+        client.force_login(user)
+        client.post(
+            reverse('posts:post_create'),
+            {'text': 'С картинкой', 'image': image_file(size=(300, 300))}
+        )
+        post = Post.objects.get(author=user)
+        self.assertEqual((post.image.width, post.image.height), (100, 100))
+
+    @override_settings(POST_IMAGE_MAX_BYTES=100)
+    def test_file_too_large(self):
+        '''Файл больше лимита отклоняется до декодирования.'''
+        self.assertRejected(image_file(size=(80, 40)), 'file_too_large')
+
+    def test_too_many_pixels(self):
+        '''Картинка больше лимита пикселей отклоняется по заголовку.'''
+        self.assertRejected(
+            image_file(size=(2000, 1000), image_format='PNG', name='a.png'),
+            'too_many_pixels'
+        )
+
+    def test_unsupported_format(self):
+        '''Формат вне списка разрешённых отклоняется.'''
+        self.assertRejected(
+            image_file(size=(10, 10), image_format='BMP', name='a.bmp'),
+            'invalid_format'
+        )
+
+    def test_not_an_image(self):
+        '''Файл, не являющийся картинкой, отклоняется.'''
+        self.assertRejected(
+            SimpleUploadedFile('text.jpg', b'not an image'), 'invalid_image'
+        )
@@ -0,0 +1,86 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN SQLite')
+class FeedIndexesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='volodia')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тест группа',
+            slug='test-slug',
+            description='Тест описание'
+        )
+        cls.post = Post.objects.create(
+            text='Тест текст',
+            author=cls.author,
+            group=cls.group
+        )
+        Comment.objects.create(post=cls.post, author=cls.user, text='Ком')
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def query_plans(self, url, table):
+        '''Планы SQLite для запросов страницы к указанной таблице.'''
+        with CaptureQueriesContext(connection) as context:
+            self.authorized_client.get(url)
+        plans = []
+        for query in context.captured_queries:
+            if f'FROM "{table}"' not in query['sql']:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+                plans.append([row[-1] for row in cursor.fetchall()])
+        self.assertTrue(plans, f'{url} не обращается к {table}')
+        return plans
+
+    def assertIndexed(self, plan):
+        for step in plan:
+            self.assertFalse(
+                step.startswith('SCAN') and 'INDEX' not in step,
+                f'Полный просмотр таблицы: {plan}'
+            )
+            self.assertNotIn('TEMP B-TREE', step, plan)
+
+    def test_feed_queries_use_indexes(self):
+        '''Ленты читаются по индексу без сортировки во временном B-tree.'''
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                for plan in self.query_plans(url, 'posts_post'):
+                    self.assertIndexed(plan)
+
+    def test_follow_feed_uses_indexes(self):
+        '''Лента подписок — один диапазонный проход по индексу FeedItem.'''
+        url = reverse('posts:follow_index')
+        plans = self.query_plans(url, 'posts_feeditem')
+        for plan in plans:
+            self.assertIndexed(plan)
+        self.assertIn('feed_user_pub_date_idx', str(plans))
+
+    def test_comments_use_index(self):
+        '''Комментарии поста читаются по индексу (post, created).'''
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        for plan in self.query_plans(url, 'posts_comment'):
+            self.assertIndexed(plan)
@@ -0,0 +1,72 @@
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, User
+
+TEXT_COLUMN = '"posts_post"."text"'
+TSVECTOR_RE = re.compile(
+    r'to_tsvector\([^()]*COALESCE\("posts_post"\."text", \'\'\)\)'
+)
+
+
+def without_tsvector(sql):
+    '''SQL без to_tsvector(text) поиска в Postgres: в WHERE его берёт
+    GIN-индекс, а в ранжировании он нужен по определению.'''
+    return TSVECTOR_RE.sub('', sql)
+
+
+class ListColumnsTest(TestCase):
+    '''Ленты не загружают полный текст постов.'''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Длинный пост ' * 1000, author=cls.author, group=cls.group
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_list_views_skip_text(self):
+        '''Ни один запрос страниц-лент не выбирает колонку text.'''
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=('group',)),
+            reverse('posts:profile', args=('author',)),
+            reverse('posts:follow_index'),
+            reverse('posts:search') + '?q=Длинный',
+            reverse('posts:index') + '?cursor=',
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Длинный пост', response.content.decode())
+                self.assertEqual([
+                    query['sql'] for query in queries.captured_queries
+                    if TEXT_COLUMN in without_tsvector(query['sql'])
+                    or 'AS "search"' in query['sql']
+                ], [])
+                for post in response.context['page_obj']:
+                    self.assertIn('text', post.get_deferred_fields())
+
+    def test_detail_loads_text(self):
+        '''Страница поста по-прежнему выводит полный текст.'''
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+        self.assertContains(response, 'Длинный пост ' * 100)
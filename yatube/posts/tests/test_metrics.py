@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(PERF_METRICS=True)
+class PerformanceMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.registry.reset()
+        self.author = User.objects.create_user(username='author')
+        self.post = Post.objects.create(text='Пост', author=self.author)
+        self.client = Client()
+
+    def timing(self, response):
+        return dict(
+            part.split(';', 1) for part in
+            response['Server-Timing'].split(', ')
+        )
+
+    def test_server_timing(self):
+        '''Ответ содержит время SQL, кеша, рендеринга и общее.'''
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        timing = self.timing(response)
+        self.assertEqual(set(timing), {'db', 'cache', 'render', 'total'})
+        self.assertNotIn('desc="0 queries"', timing['db'])
+
+    def test_cache_hits_counted(self):
+        '''Повторный запрос страницы ленты — попадание в кеш.'''
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(reverse('posts:index'))
+        self.assertIn('hits', self.timing(response)['cache'])
+        self.assertNotIn('"0 hits', self.timing(response)['cache'])
+
+    def test_metrics_endpoint(self):
+        '''/metrics отдаёт гистограммы по имени view.'''
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(reverse('metrics'))
+        body = response.content.decode()
+        self.assertIn('# TYPE yatube_request_duration_seconds histogram', body)
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 1',
+            body
+        )
+        self.assertIn('yatube_requests_total{view="posts:index"} 1', body)
+
+    def test_log_line(self):
+        '''PERF_METRICS_LOG пишет строку с замерами view.'''
+        with override_settings(PERF_METRICS_LOG=True):
+            with self.assertLogs('core.metrics', 'INFO') as logs:
+                Client().get(reverse('posts:index'))
+        self.assertIn('view=posts:index', logs.output[0])
+        self.assertIn('queries=', logs.output[0])
+
+    @override_settings(PERF_METRICS=False)
+    def test_disabled(self):
+        '''Без PERF_METRICS нет ни заголовка, ни /metrics.'''
+        client = Client()
+        response = client.get(reverse('posts:index'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(client.get(reverse('metrics')).status_code, 404)
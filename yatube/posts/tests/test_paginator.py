@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.paginator import Page
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.paginators import CursorPage, InvalidCursor, decode_cursor
+
+User = get_user_model()
+
+
+class CursorPaginatorTest(TestCase):
+    NUMBER_OF_CREATE_TEST_POSTS = 23
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='volodia',
+            password='12345'
+        )
+        cls.group = Group.objects.create(
+            title='Тест группа',
+            slug='test-slug',
+            description='Тест описание'
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Тест текст + {i}', author=cls.user, group=cls.group)
+            for i in range(cls.NUMBER_OF_CREATE_TEST_POSTS)
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.user}),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def walk(self, url):
+        '''Проходит ленту по ссылкам next_cursor до конца.'''
+        seen = []
+        response = self.guest_client.get(url + '?cursor=')
+        while True:
+            page_obj = response.context['page_obj']
+            self.assertIsInstance(page_obj, CursorPage)
+            seen.extend(post.pk for post in page_obj)
+            if not page_obj.has_next():
+                return seen, page_obj
+            response = self.guest_client.get(
+                url, {'cursor': page_obj.next_cursor}
+            )
+
+    def test_cursor_walk_matches_order(self):
+        '''Курсорный обход отдаёт все посты по порядку без повторов.'''
+        expected = list(
+            Post.objects.order_by('-pub_date', '-id')
+            .values_list('pk', flat=True)
+        )
+        for url in self.urls:
+            with self.subTest(url=url):
+                seen, _ = self.walk(url)
+                self.assertEqual(seen, expected)
+
+    def test_previous_cursor_returns_previous_page(self):
+        '''Ссылка «Предыдущая» возвращает ту же страницу, что и раньше.'''
+        url = reverse('posts:index')
+        first = self.guest_client.get(url + '?cursor=')
+        first_page = list(first.context['page_obj'])
+        second = self.guest_client.get(
+            url, {'cursor': first.context['page_obj'].next_cursor}
+        )
+        back = self.guest_client.get(
+            url, {'cursor': second.context['page_obj'].previous_cursor}
+        )
+        self.assertEqual(list(back.context['page_obj']), first_page)
+        self.assertFalse(back.context['page_obj'].has_previous())
+
+    def test_page_number_links_still_work(self):
+        '''Старые ссылки ?page=N работают и в курсорном режиме.'''
+        with override_settings(POSTS_CURSOR_PAGINATION=True):
+            response = self.guest_client.get(
+                reverse('posts:index') + '?page=3'
+            )
+        self.assertIsInstance(response.context['page_obj'], Page)
+        self.assertEqual(response.context['page_obj'].number, 3)
+
+    def test_setting_enables_cursor_mode(self):
+        '''POSTS_CURSOR_PAGINATION включает курсоры без параметров.'''
+        with override_settings(POSTS_CURSOR_PAGINATION=True):
+            response = self.guest_client.get(reverse('posts:index'))
+        self.assertIsInstance(response.context['page_obj'], CursorPage)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        '''Испорченный токен не приводит к ошибке.'''
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('garbage')
+        response = self.guest_client.get(
+            reverse('posts:index'), {'cursor': 'garbage'}
+        )
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertFalse(response.context['page_obj'].has_previous())
@@ -0,0 +1,112 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class QueryCountTest(TestCase):
+    '''Число запросов страницы не зависит от числа постов на ней.'''
+
+    PAGE_SIZE = 10
+
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='Тест группа',
+            slug='test-slug',
+            description='Тест описание'
+        )
+        self.authors = []
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+        self.add_posts(1)
+        self.post = Post.objects.first()
+
+    def add_posts(self, number):
+        for _ in range(number):
+            author = User.objects.create_user(
+                username=f'author{len(self.authors)}',
+                first_name='Лев',
+                last_name='Толстой'
+            )
+            self.authors.append(author)
+            Follow.objects.create(user=self.reader, author=author)
+            Post.objects.create(
+                text='Тест текст', author=author, group=self.group
+            )
+
+    def add_comments(self, number):
+        for author in self.authors[:number]:
+            Comment.objects.create(
+                post=self.post, author=author, text='Комментарий'
+            )
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            self.authorized_client.get(url)
+        return len(context)
+
+    def assertQueriesConstant(self, url_factory, grow):
+        expected = self.count_queries(url_factory())
+        grow()
+        cache.clear()
+        with self.assertNumQueries(expected):
+            self.authorized_client.get(url_factory())
+
+    def grow_feeds(self):
+        self.add_posts(self.PAGE_SIZE)
+
+    def test_index_page(self):
+        '''Главная рендерится за фиксированное число запросов.'''
+        self.assertQueriesConstant(
+            lambda: reverse('posts:index'), self.grow_feeds
+        )
+
+    def test_group_list_page(self):
+        '''Лента группы рендерится за фиксированное число запросов.'''
+        self.assertQueriesConstant(
+            lambda: reverse(
+                'posts:group_list', kwargs={'slug': self.group.slug}
+            ),
+            self.grow_feeds
+        )
+
+    def test_follow_index_page(self):
+        '''Лента подписок рендерится за фиксированное число запросов.'''
+        self.assertQueriesConstant(
+            lambda: reverse('posts:follow_index'), self.grow_feeds
+        )
+
+    def test_profile_page(self):
+        '''Профиль рендерится за фиксированное число запросов.'''
+        author = self.authors[0]
+
+        def grow():
+            for _ in range(self.PAGE_SIZE):
+                Post.objects.create(
+                    text='Тест текст', author=author, group=self.group
+                )
+
+        self.assertQueriesConstant(
+            lambda: reverse('posts:profile', kwargs={'username': author}),
+            grow
+        )
+
+    def test_post_detail_page(self):
+        '''Страница поста не делает запрос на каждый комментарий.'''
+        self.add_posts(self.PAGE_SIZE)
+        self.add_comments(1)
+        self.assertQueriesConstant(
+            lambda: reverse(
+                'posts:post_detail', kwargs={'post_id': self.post.pk}
+            ),
+            lambda: self.add_comments(self.PAGE_SIZE)
+        )
@@ -0,0 +1,104 @@
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.management.commands.replicate import replicate
+from core.middleware import ReplicaMiddleware
+from posts.models import Post
+from posts.page_cache import cached_feed
+
+
+@override_settings(REPLICA_DATABASES=['replica1'])
+class ReplicaRoutingTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.read_from = []
+
+    def view(self, request):
+        self.read_from.append(router.db_for_read(Post))
+        if request.GET.get('write'):
+            router.db_for_write(Post)
+            self.read_from.append(router.db_for_read(Post))
+        return HttpResponse()
+
+    def run_request(self, request):
+        return ReplicaMiddleware(self.view)(request)
+
+    def test_get_reads_replica(self):
+        '''GET читает с реплики и не ставит cookie.'''
+        response = self.run_request(self.factory.get('/'))
+        self.assertEqual(self.read_from, ['replica1'])
+        self.assertNotIn(settings.REPLICA_STICKY_COOKIE, response.cookies)
+
+    def test_post_reads_primary_and_sticks(self):
+        '''POST работает с основной БД и включает «липкость».'''
+        response = self.run_request(self.factory.post('/'))
+        self.assertEqual(self.read_from, ['default'])
+        cookie = response.cookies[settings.REPLICA_STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_STICKY_SECONDS)
+
+    def test_sticky_cookie_reads_primary(self):
+        '''После записи пользователь читает из основной БД.'''
+        request = self.factory.get('/')
+        request.COOKIES[settings.REPLICA_STICKY_COOKIE] = '1'
+        self.run_request(request)
+        self.assertEqual(self.read_from, ['default'])
+
+    def test_write_in_get_switches_to_primary(self):
+        '''Запись посреди GET переводит остаток запроса на основную БД.'''
+        response = self.run_request(self.factory.get('/', {'write': 1}))
+        self.assertEqual(self.read_from, ['replica1', 'default'])
+        self.assertIn(settings.REPLICA_STICKY_COOKIE, response.cookies)
+
+    def test_database_cache_uses_primary(self):
+        '''Кеш в БД читается из основной БД, и его запись в GET не
+        включает «липкость».'''
+        def view(request):
+            entry = DatabaseCache('django_cache', {}).cache_model_class
+            self.read_from.append(router.db_for_read(entry))
+            router.db_for_write(entry)
+            self.read_from.append(router.db_for_read(Post))
+            return HttpResponse()
+
+        response = ReplicaMiddleware(view)(self.factory.get('/'))
+        self.assertEqual(self.read_from, ['default', 'replica1'])
+        self.assertNotIn(settings.REPLICA_STICKY_COOKIE, response.cookies)
+
+    def test_outside_request_reads_primary(self):
+        '''Команды и фоновые задачи читают из основной БД.'''
+        self.assertEqual(router.db_for_read(Post), 'default')
+
+    def test_page_cache_miss_reads_primary(self):
+        '''Страница для кеша собирается по основной БД.'''
+        cache.clear()
+        request = self.factory.get('/')
+        request.user = AnonymousUser()
+        ReplicaMiddleware(cached_feed(lambda request: ())(self.view))(
+            request
+        )
+        self.assertEqual(self.read_from, ['default'])
+
+
+class ReplicateTest(SimpleTestCase):
+    def test_copies_snapshot(self):
+        '''replicate переносит в реплику текущее содержимое основной БД.'''
+        with tempfile.TemporaryDirectory() as directory:
+            source = str(Path(directory, 'primary.sqlite3'))
+            target = str(Path(directory, 'replica.sqlite3'))
+            with closing(sqlite3.connect(source)) as primary:
+                primary.execute('CREATE TABLE post (text TEXT)')
+                primary.execute("INSERT INTO post VALUES ('Пост')")
+                primary.commit()
+            replicate(source, target)
+            with closing(sqlite3.connect(target)) as replica:
+                rows = replica.execute('SELECT text FROM post').fetchall()
+        self.assertEqual(rows, [('Пост',)])
@@ -0,0 +1,134 @@
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, PostSearchEntry
+from posts.search import match_expression, rebuild_index, stems
+
+User = get_user_model()
+
+
+class StemmerTest(TestCase):
+    def test_word_forms_share_stem(self):
+        '''Разные формы слова приводятся к одной основе.'''
+        self.assertEqual(stems('Котами'), stems('кот'))
+        self.assertEqual(stems('ёлки'), stems('елка'))
+
+    def test_match_expression_quotes_terms(self):
+        '''Спецсимволы FTS5 в запросе не ломают выражение.'''
+        self.assertEqual(
+            match_expression('коты* AND "NEAR('), '"кот" "and" "near"'
+        )
+        self.assertIsNone(match_expression('*** ""'))
+
+
+class SearchViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='volodia')
+        self.client = Client()
+        self.url = reverse('posts:search')
+
+    def create_post(self, text):
+        return Post.objects.create(text=text, author=self.user)
+
+    def found(self, query, **params):
+        response = self.client.get(self.url, {'q': query, **params})
+        return response.context['page_obj']
+
+    def test_finds_word_forms(self):
+        '''Пост находится по другой форме слова.'''
+        post = self.create_post('Кошки гуляют сами по себе')
+        self.create_post('Собаки лают')
+        self.assertEqual(list(self.found('кошка')), [post])
+
+    def test_all_terms_required(self):
+        '''Находятся только посты со всеми словами запроса.'''
+        both = self.create_post('Кошки и собаки')
+        self.create_post('Только кошки')
+        self.assertEqual(list(self.found('кошки собаки')), [both])
+
+    def test_ranked_by_relevance(self):
+        '''Пост, где слово встречается чаще, выше в выдаче.'''
+        once = self.create_post('Кот спит, а пёс лает и бегает по двору')
+        often = self.create_post('Кот, кот и ещё раз кот')
+        self.assertEqual(list(self.found('кот')), [often, once])
+
+    def test_edit_and_delete_update_index(self):
+        '''Редактирование и удаление поста обновляют индекс.'''
+        post = self.create_post('Старый текст')
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(list(self.found('старый')), [])
+        self.assertEqual(list(self.found('новый')), [post])
+        post.delete()
+        self.assertEqual(list(self.found('новый')), [])
+
+    def test_empty_query(self):
+        '''Пустой запрос ничего не ищет.'''
+        self.create_post('Текст')
+        with self.assertNumQueries(0):
+            self.assertEqual(list(self.found('  ')), [])
+
+    def test_cursor_pagination(self):
+        '''Страницы выдачи идут по курсору без повторов и пропусков.'''
+        posts = {self.create_post(f'Пост про котов {number}')
+                 for number in range(15)}
+        first = self.found('кот')
+        second = self.found('кот', cursor=first.next_cursor)
+        self.assertEqual(len(first), 10)
+        self.assertFalse(second.has_next())
+        self.assertEqual(set(first) | set(second), posts)
+        previous = self.found('кот', cursor=second.previous_cursor)
+        self.assertEqual(list(previous), list(first))
+
+    def test_only_newest_matches_ranked(self):
+        '''Старше RANKED_MATCHES совпадения не теряются, а идут по дате.'''
+        often = self.create_post('Кот, кот и ещё раз кот')
+        posts = [self.create_post(f'Кот {number}') for number in range(4)]
+        found = []
+        cursor = ''
+        with mock.patch('posts.search.RANKED_MATCHES', 3), \
+                mock.patch('posts.views.NUMBER_OF_POST_ON_PAGES', 2):
+            while cursor is not None:
+                page = self.found('кот', cursor=cursor)
+                found += page
+                cursor = page.next_cursor
+        self.assertEqual(len(found), 5)
+        self.assertEqual(set(found[:3]), set(posts[1:]))
+        self.assertEqual(found[3:], [posts[0], often])
+
+    def test_query_kept_in_page_links(self):
+        '''Ссылки на страницы сохраняют поисковый запрос.'''
+        for number in range(11):
+            self.create_post(f'Пост про котов {number}')
+        response = self.client.get(self.url, {'q': 'кот'})
+        self.assertContains(response, '?q=%D0%BA%D0%BE%D1%82&cursor=')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'индекс FTS5 есть только в SQLite')
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='volodia')
+
+    def test_saving_other_fields_keeps_index(self):
+        '''Сохранение без текста не переписывает индекс.'''
+        post = Post.objects.create(text='Кот', author=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            post.save(update_fields=['thumbnails'])
+        table = PostSearchEntry._meta.db_table
+        self.assertFalse(
+            [query for query in queries if table in query['sql']]
+        )
+
+    def test_rebuild_index(self):
+        '''Перестроение индекса восстанавливает основы слов.'''
+        post = Post.objects.create(text='Котами', author=self.user)
+        PostSearchEntry.objects.all().delete()
+        self.assertEqual(rebuild_index(Post.objects.all()), 1)
+        self.assertEqual(
+            PostSearchEntry.objects.get(pk=post.pk).body, 'кот'
+        )
@@ -0,0 +1,79 @@
+import random
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.test import TestCase, override_settings
+
+from posts.models import Comment, FeedItem, Follow, Post, Profile
+from posts.seed import seed
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_ASYNC=False)
+class SeedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.result = seed(
+            random.Random(1), users=30, groups=3, posts=300, comments=500,
+            follows=5, images=0.1, prefix='t'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_counts(self):
+        '''Создаётся запрошенное число объектов.'''
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 500)
+        self.assertEqual(Follow.objects.count(), self.result['follows'])
+        self.assertEqual(FeedItem.objects.count(), self.result['feed_items'])
+        self.assertGreater(self.result['feed_items'], 0)
+        self.assertTrue(Post.objects.exclude(image='').exists())
+
+    def test_dates_follow_ids(self):
+        '''Даты публикации растут вместе с id, как у настоящих постов.'''
+        dates = list(Post.objects.order_by('id').values_list(
+            'pub_date', flat=True
+        ))
+        self.assertEqual(dates, sorted(dates))
+        self.assertNotEqual(dates[0], dates[-1])
+
+    def test_counters_rebuilt(self):
+        '''Счётчики профилей совпадают с данными.'''
+        for profile in Profile.objects.select_related('user'):
+            self.assertEqual(
+                profile.posts_count,
+                Post.objects.filter(author=profile.user).count()
+            )
+            self.assertEqual(
+                profile.followers_count,
+                Follow.objects.filter(author=profile.user).count()
+            )
+
+    def test_followers_skewed(self):
+        '''Подписчики распределены по степенному закону.'''
+        followers = list(Follow.objects.values('author').annotate(
+            total=Count('id')
+        ).values_list('total', flat=True))
+        self.assertGreater(max(followers), 2 * sum(followers) / 30)
+        self.assertFalse(Follow.objects.filter(
+            user_id=F('author_id')
+        ).exists())
+
+    def test_loadtest(self):
+        '''Нагрузочный тест обходит все страницы без ошибок.'''
+        out = StringIO()
+        call_command('loadtest', requests=40, stdout=out)
+        report = out.getvalue()
+        for view in ('index', 'group_list', 'profile', 'post_detail',
+                     'follow_index'):
+            self.assertIn(view, report)
+        for line in report.splitlines()[1:-1]:
+            self.assertTrue(line.endswith(' 0'), line)
@@ -0,0 +1,39 @@
+import tempfile
+from pathlib import Path
+from unittest import skipUnless
+
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Прагмы только для SQLite')
+class SQLitePragmasTest(TestCase):
+    def pragma(self, name, db=connection):
+        with db.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_connection_configured(self):
+        '''Новое соединение получает прагмы из SQLITE_PRAGMAS.'''
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('cache_size'), -64 * 2 ** 10)
+
+    def test_file_database_uses_wal(self):
+        '''Файловая БД переводится в режим WAL.'''
+        with tempfile.TemporaryDirectory() as directory:
+            db = type(connections['default'])({
+                **connection.settings_dict,
+                'NAME': str(Path(directory, 'wal.sqlite3')),
+            }, alias='wal')
+            try:
+                self.assertEqual(self.pragma('journal_mode', db), 'wal')
+            finally:
+                db.close()
+
+
+class ConnectionSettingsTest(SimpleTestCase):
+    def test_persistent_connections(self):
+        '''Соединения переиспользуются между запросами.'''
+        self.assertGreater(connection.settings_dict['CONN_MAX_AGE'], 0)
+        self.assertTrue(connection.settings_dict['CONN_HEALTH_CHECKS'])
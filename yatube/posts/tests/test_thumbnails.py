@@ -0,0 +1,100 @@
+import io
+import shutil
+import tempfile
+from unittest import mock, skipUnless
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts import thumbnails
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_file(name='big.png', size=(1200, 800)):
+    content = io.BytesIO()
+    Image.new('RGB', size, 'red').save(content, 'PNG')
+    return SimpleUploadedFile(name, content.getvalue(), 'image/png')
+
+
+@skipUnless(apps.is_installed('sorl.thumbnail'), 'нужен sorl.thumbnail')
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_ASYNC=False)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='volodia')
+        self.client = Client()
+
+    def tearDown(self):
+        cache.clear()
+
+    def create_post(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Post.objects.create(
+                text='Тест текст', author=self.user, **kwargs
+            )
+
+    def test_thumbnails_generated_after_commit(self):
+        '''После сохранения поста с картинкой строится миниатюра.'''
+        post = self.create_post(image=image_file())
+        post.refresh_from_db()
+        self.assertEqual(post.thumbnails['source'], post.image.name)
+        self.assertIn('card', post.thumbnails)
+        self.assertFalse(thumbnails.needs_thumbnails(post))
+
+    def test_post_without_image_skipped(self):
+        '''Для поста без картинки миниатюры не строятся.'''
+        with mock.patch('posts.thumbnails.generate') as generate:
+            post = self.create_post()
+        generate.assert_not_called()
+        self.assertEqual(post.thumbnails, {})
+
+    def test_unchanged_image_not_regenerated(self):
+        '''Редактирование текста не перестраивает миниатюры.'''
+        post = self.create_post(image=image_file())
+        post.refresh_from_db()
+        with mock.patch('sorl.thumbnail.get_thumbnail') as get_thumbnail:
+            with self.captureOnCommitCallbacks(execute=True):
+                post.text = 'Новый текст'
+                post.save()
+        get_thumbnail.assert_not_called()
+
+    def test_pages_use_stored_thumbnail(self):
+        '''Страницы отдают готовый URL без вызова sorl при рендере.'''
+        post = self.create_post(image=image_file())
+        post.refresh_from_db()
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        )
+        with mock.patch('sorl.thumbnail.get_thumbnail') as get_thumbnail:
+            for url in urls:
+                with self.subTest(url=url):
+                    response = self.client.get(url)
+                    self.assertContains(response, post.thumbnails['card'])
+        get_thumbnail.assert_not_called()
+
+    def test_original_shown_until_ready(self):
+        '''Пока миниатюра не готова, показывается оригинал.'''
+        with mock.patch('posts.thumbnails.schedule'):
+            post = Post.objects.create(
+                text='Тест текст', author=self.user, image=image_file()
+            )
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertContains(response, post.image.url)
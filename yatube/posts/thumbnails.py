@@ -0,0 +1,58 @@
+import logging
+
+from django.apps import apps
+from django.conf import settings
+
+from core import background
+from posts.models import Post
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = {
+    'card': ('960x339', {'crop': 'center', 'upscale': True}),
+}
+
+
+def enabled():
+    return apps.is_installed('sorl.thumbnail')
+
+
+def needs_thumbnails(post):
+    '''Миниатюры не построены для текущей картинки поста.'''
+    return bool(post.image) and (
+        post.thumbnails.get('source') != post.image.name
+    )
+
+
+def generate(post_id):
+    '''Строит все варианты миниатюр поста и сохраняет их URL.
+
+    Сохранение через save() запускает обычные сигналы поста, поэтому
+    кеш карточек и страниц лент сбрасывается, как при редактировании.
+    '''
+    from sorl.thumbnail import get_thumbnail
+
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not needs_thumbnails(post):
+        return None
+    thumbnails = {'source': post.image.name}
+    for name, (geometry, options) in VARIANTS.items():
+        thumbnails[name] = get_thumbnail(post.image, geometry, **options).url
+    post.thumbnails = thumbnails
+    post.save(update_fields=['thumbnails', 'updated_at'])
+    return thumbnails
+
+
+def run(post_id):
+    try:
+        generate(post_id)
+    except Exception:
+        logger.exception('Не удалось построить миниатюры поста %s', post_id)
+
+
+def schedule(post):
+    '''После коммита ставит построение миниатюр в фоновый пул.'''
+    if enabled() and needs_thumbnails(post):
+        background.on_commit(
+            run, post.pk, background=settings.THUMBNAIL_ASYNC
+        )
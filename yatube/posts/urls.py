@@ -2,15 +2,24 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path
 
-from posts import views
+from posts import async_views, views
 
 app_name = 'posts'
 
+# Под ASGI страницы для чтения обслуживают async-версии.
+pages = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
-    path('', views.index, name='index'),
-    path('group/<slug:slug>/', views.group_posts, name='group_list'),
-    path('profile/<str:username>/', views.profile, name='profile'),
-    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('', pages.index, name='index'),
+    path('group/<slug:slug>/', pages.group_posts, name='group_list'),
+    path('profile/<str:username>/', pages.profile, name='profile'),
+    path('search/', views.search, name='search'),
+    path('posts/<int:post_id>/', pages.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path(
@@ -18,7 +27,7 @@ urlpatterns = [
         views.add_comment,
         name='add_comment'
     ),
-    path('follow/', views.follow_index, name='follow_index'),
+    path('follow/', pages.follow_index, name='follow_index'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -1,68 +1,151 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.views.decorators.cache import cache_page
 from django.shortcuts import get_object_or_404, redirect, render
 
+from posts.cards import attach_card_versions
+from posts.conditional import (
+    conditional, feed_validators, post_validators
+)
+from posts.counters import profile_of
+from posts.feeds import feed_posts, follow_feed
 from posts.forms import CommentForm, PostForm
 from posts.models import Group, Follow, Post, User
+from posts.page_cache import (
+    cached_feed, follow_scopes, group_scopes, index_scopes, profile_scopes
+)
+from posts.paginators import COMMENT_ORDERING, POST_ORDERING, CursorPaginator
+from posts.search import RANK_ORDERING, search_posts
 
 NUMBER_OF_POST_ON_PAGES = 10
 
 
-def paginator(request, post_list):
+def paginator(request, post_list, ordering=POST_ORDERING):
+    cursor = request.GET.get('cursor')
+    if cursor is not None or (
+        settings.POSTS_CURSOR_PAGINATION and 'page' not in request.GET
+    ):
+        return CursorPaginator(
+            post_list, NUMBER_OF_POST_ON_PAGES, ordering
+        ).get_page(cursor)
     paginator = Paginator(post_list, NUMBER_OF_POST_ON_PAGES)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
 
 
-@cache_page(20, key_prefix='index_page')
-def index(request):
-    template = 'posts/index.html'
-    post_list = Post.objects.select_related('group').all()
-    context = {
-        'page_obj': paginator(request, post_list),
+# Контексты страниц для чтения общие для этих view и posts.async_views.
+
+def index_context(request):
+    post_list = Post.objects.for_list()
+    return {
+        'page_obj': attach_card_versions(paginator(request, post_list)),
     }
-    return render(request, template, context)
 
 
-def group_posts(request, slug):
-    template = 'posts/group_list.html'
+def group_posts_context(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    context = {
+    post_list = group.posts.for_list()
+    return {
         'group': group,
-        'page_obj': paginator(request, post_list),
+        'page_obj': attach_card_versions(paginator(request, post_list)),
     }
-    return render(request, template, context)
 
 
-def profile(request, username):
-    template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    all_posts_user = author.posts.all()
-    post_count = author.posts.count()
+def profile_context(request, username):
+    author = get_object_or_404(
+        User.objects.select_related('profile'), username=username
+    )
+    all_posts_user = author.posts.for_list()
+    post_count = profile_of(author).posts_count
     context = {
         'author': author,
-        'page_obj': paginator(request, all_posts_user),
+        'page_obj': attach_card_versions(
+            paginator(request, all_posts_user)
+        ),
         'post_count': post_count,
     }
     if request.user.is_authenticated:
         following = author.following.filter(user=request.user).exists()
         context['following'] = following
+    return context
+
+
+def post_detail_context(request, post_id):
+    post = get_object_or_404(Post.objects.for_detail(), id=post_id)
+    post_count = profile_of(post.author).posts_count
+    return {
+        'post': post,
+        'post_count': post_count,
+        'form': CommentForm(request.POST or None),
+        'comments': comments_page(post.comments)
+    }
+
+
+def follow_index_context(request):
+    feed, ordering = follow_feed(request.user)
+    page_obj = paginator(request, feed, ordering=ordering)
+    page_obj.object_list = feed_posts(page_obj.object_list)
+    return {
+        'page_obj': attach_card_versions(page_obj)
+    }
+
+
+@conditional(feed_validators(index_scopes))
+@cached_feed(index_scopes)
+def index(request):
+    template = 'posts/index.html'
+    return render(request, template, index_context(request))
+
+
+@conditional(feed_validators(group_scopes))
+@cached_feed(group_scopes)
+def group_posts(request, slug):
+    template = 'posts/group_list.html'
+    return render(request, template, group_posts_context(request, slug))
+
+
+@conditional(feed_validators(profile_scopes))
+@cached_feed(profile_scopes)
+def profile(request, username):
+    template = 'posts/profile.html'
+    return render(request, template, profile_context(request, username))
+
+
+def search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    post_list = search_posts(Post.objects.for_list(), query)
+    page_obj = CursorPaginator(
+        post_list, NUMBER_OF_POST_ON_PAGES, RANK_ORDERING, parse=float
+    ).get_page(request.GET.get('cursor'))
+    context = {
+        'query': query,
+        'page_obj': attach_card_versions(page_obj),
+    }
     return render(request, template, context)
 
 
+def comments_page(comments, cursor=None):
+    return CursorPaginator(
+        comments.for_list(), settings.COMMENTS_PER_PAGE, COMMENT_ORDERING
+    ).get_page(cursor)
+
+
+@conditional(post_validators)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, id=post_id)
-    post_count = post.author.posts.count()
-    comments_post = post.comments.all()
+    return render(request, template, post_detail_context(request, post_id))
+
+
+@conditional(post_validators)
+def post_comments(request, post_id):
+    '''Следующие страницы комментариев — HTML-фрагмент для post_detail.'''
+    template = 'posts/includes/comments.html'
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
     context = {
         'post': post,
-        'post_count': post_count,
-        'form': CommentForm(request.POST or None),
-        'comments': comments_post
+        'comments': comments_page(post.comments, request.GET.get('cursor')),
     }
     return render(request, template, context)
 
@@ -114,13 +197,11 @@ def add_comment(request, post_id):
 
 
 @login_required
+@conditional(feed_validators(follow_scopes))
+@cached_feed(follow_scopes)
 def follow_index(request):
     template_name = 'posts/follow.html'
-    post_list = Post.objects.filter(author__following__user=request.user)
-    context = {
-        'page_obj': paginator(request, post_list)
-    }
-    return render(request, template_name, context)
+    return render(request, template_name, follow_index_context(request))
 
 
 @login_required
@@ -0,0 +1,21 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Pages for reading are served by async views (posts.async_views).
+Persistent connections are off: every ASGI request runs in its own context
+and would open a connection that is never reused.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+os.environ.setdefault('ASYNC_VIEWS', '1')
+os.environ.setdefault('CONN_MAX_AGE', '0')
+
+application = get_asgi_application()
@@ -2,6 +2,8 @@ import os
 
 from dotenv import load_dotenv
 
+from yatube.env import cache_from_url, database_from_url, replica_databases
+
 load_dotenv()
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -23,12 +25,16 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'rest_framework',
 ]
 
 if DEBUG:
     INSTALLED_APPS.append('sorl.thumbnail',)
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,13 +65,34 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+ASGI_APPLICATION = 'yatube.asgi.application'
+
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS') == '1'
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    'default': database_from_url(os.getenv('DATABASE_URL'), BASE_DIR),
+}
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+    'synchronous': 'normal',
+    'mmap_size': 256 * 2 ** 20,
+    'cache_size': -64 * 2 ** 10,
 }
 
+DATABASES.update(
+    replica_databases(os.getenv('DATABASE_REPLICAS'), BASE_DIR)
+)
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+REPLICA_STICKY_COOKIE = 'primary_reads'
+
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 10))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.'
@@ -111,8 +138,69 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2 * 2 ** 20
+
+POST_IMAGE_MAX_BYTES = int(os.getenv('POST_IMAGE_MAX_BYTES', 20 * 2 ** 20))
+
+POST_IMAGE_MAX_PIXELS = int(os.getenv('POST_IMAGE_MAX_PIXELS', 60 * 10 ** 6))
+
+POST_IMAGE_MAX_SIDE = int(os.getenv('POST_IMAGE_MAX_SIDE', 2048))
+
+POST_IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
 CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    'default': cache_from_url(os.getenv('CACHE_URL'), BASE_DIR),
+}
+
+# Сессия читается из кеша: ответ 304 авторизованному пользователю
+# не стоит лишнего запроса к django_session.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+POSTS_CURSOR_PAGINATION = os.getenv('POSTS_CURSOR_PAGINATION') == '1'
+
+COMMENTS_PER_PAGE = int(os.getenv('COMMENTS_PER_PAGE', 50))
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': (
+        'rest_framework.authentication.BasicAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ),
+    'DEFAULT_PERMISSION_CLASSES': (
+        'rest_framework.permissions.IsAuthenticatedOrReadOnly',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+        *(('rest_framework.renderers.BrowsableAPIRenderer',) if DEBUG else ()),
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.IdCursorPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', 20)),
+}
+
+FEED_FANOUT_LIMIT = int(os.getenv('FEED_FANOUT_LIMIT', 10000))
+
+FEED_PAGE_CACHE_TIMEOUT = int(os.getenv('FEED_PAGE_CACHE_TIMEOUT', 60 * 60))
+
+FEED_PAGE_LOCK_WAIT = float(os.getenv('FEED_PAGE_LOCK_WAIT', 2))
+
+THUMBNAIL_ASYNC = os.getenv('THUMBNAIL_ASYNC', '1') == '1'
+
+BACKGROUND_WORKERS = int(os.getenv('BACKGROUND_WORKERS', 2))
+
+PERF_METRICS = os.getenv('PERF_METRICS') == '1'
+
+PERF_METRICS_LOG = os.getenv('PERF_METRICS_LOG') == '1'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.metrics': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
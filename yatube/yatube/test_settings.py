@@ -0,0 +1,10 @@
+'''Настройки для manage.py test и pytest.'''
+from yatube.settings import *  # noqa: F401,F403
+from yatube.settings import BASE_DIR
+from yatube.env import cache_from_url
+
+# Тесты чистят кеш и считают запросы к БД: им нужен свой кеш в памяти
+# процесса, а не рабочий кеш из CACHE_URL.
+CACHES = {
+    'default': cache_from_url('locmem://', BASE_DIR),
+}